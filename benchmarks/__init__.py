@@ -0,0 +1 @@
+"""Benchmarks of the dashboard pipeline on synthetic OWID-shaped datasets."""
@@ -0,0 +1,255 @@
+"""Time each stage of the dashboard pipeline on synthetic datasets.
+
+Every stage is run ``--repeat`` times for the wall time (the minimum is
+recorded), once more under :mod:`tracemalloc` for the peak Python-heap
+allocation, and once more for the peak resident memory and the Arrow memory
+it retains. :mod:`tracemalloc` does not see Arrow buffers (the store and
+pandas ``str`` columns), which the resident-memory figures include. The
+peak RSS of a stage is measured by resetting the process high-water mark
+through ``/proc/self/clear_refs``, so it is only recorded on Linux. Results
+are written as JSON together with the git commit and library versions so
+runs can be compared across commits::
+
+    python -m benchmarks.run --scales 1 10 --output bench-results.json
+    python -m benchmarks.run --scales 1 --baseline bench-results.json
+
+Stages prefixed ``original_`` reproduce the inline code ``app.py`` used to
+run, for comparison with the package functions that replaced it.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.synthetic import SCALES, ensure_dataset
+from covid_analysis.aggregates import country_summary
+from covid_analysis.compact import CompactData
+from covid_analysis.figures import comparison_chart, country_chart, to_png
+from covid_analysis.index import LocationIndex
+from covid_analysis.loader import clean_covid_data, read_owid_csv
+from covid_analysis.matrix import MetricMatrix
+from covid_analysis.query import query
+from covid_analysis.store import build_store, read_store
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(REPO_ROOT, "benchmarks", "data")
+COUNTRIES = ["Poland", "Italy"]
+RANGE = (pd.Timestamp("2020-06-01"), pd.Timestamp("2020-08-31"))
+
+
+def original_clean(df_covid):
+    cols = ["location", "date", "total_cases",
+            "total_deaths", "gdp_per_capita", "human_development_index"]
+    df_covid = df_covid[cols].copy()
+    df_covid["date"] = pd.to_datetime(df_covid["date"])
+    df_covid = df_covid.dropna(subset=["total_cases", "total_deaths"])
+    mode = df_covid["gdp_per_capita"].mode()[0]
+    df_covid = df_covid.fillna({"gdp_per_capita": mode})
+    mode = df_covid["human_development_index"].mode()[0]
+    df_covid = df_covid.fillna({"human_development_index": mode})
+    df_covid.columns = df_covid.columns.str.replace("_", " ").str.title()
+    return df_covid
+
+
+def original_latest_cfr(df_covid):
+    df_latest = df_covid.sort_values("Date").groupby("Location").last()
+    df_latest["CFR %"] = ((df_latest["Total Deaths"] / df_latest["Total Cases"]) * 100).round(2)
+    df_top = df_covid[df_covid["Location"] != "World"]
+    df_top.groupby(["Location"])["Total Cases"].max().sort_values(ascending=False).head()
+    df_top.groupby(["Location"])["Total Deaths"].max().sort_values(ascending=False).head()
+    return df_latest
+
+
+def original_filter(df_covid):
+    return [df_covid[df_covid["Location"] == country].sort_values("Date") for country in COUNTRIES]
+
+
+def original_range(df_covid):
+    df_range = df_covid[df_covid["Location"].isin(COUNTRIES)]
+    return df_range[(df_range["Date"] >= RANGE[0]) & (df_range["Date"] <= RANGE[1])]
+
+
+def original_pivot(df_covid):
+    df_compare = df_covid[df_covid["Location"].isin(COUNTRIES)]
+    return [df_compare.pivot(index="Date", columns="Location", values=metric)
+            for metric in ["Total Cases", "Total Deaths"]]
+
+
+def stages(csv_path, store_path):
+    """Return ``[(name, function(context) -> result)]``; results feed later stages."""
+    return [
+        ("original_read_csv", lambda ctx: pd.read_csv(csv_path)),
+        ("original_clean", lambda ctx: original_clean(ctx["original_read_csv"])),
+        ("read_csv_pruned", lambda ctx: read_owid_csv(csv_path)),
+        ("clean", lambda ctx: clean_covid_data(ctx["read_csv_pruned"])),
+        ("store_build", lambda ctx: build_store(csv_path, store_path)),
+        ("store_load", lambda ctx: read_store(store_path)),
+        ("original_latest_cfr", lambda ctx: original_latest_cfr(ctx["clean"])),
+        ("compact", lambda ctx: CompactData(ctx["store_load"])),
+        ("location_index", lambda ctx: LocationIndex(ctx["store_load"])),
+        ("compact_index", lambda ctx: LocationIndex(ctx["compact"].daily)),
+        ("country_summary", lambda ctx: country_summary(ctx["location_index"].df)),
+        ("compact_summary", lambda ctx: country_summary(ctx["compact_index"].df,
+                                                        ctx["compact"].indicators)),
+        ("original_filter", lambda ctx: original_filter(ctx["clean"])),
+        ("index_filter", lambda ctx: [ctx["location_index"].series(country)
+                                      for country in COUNTRIES]),
+        ("original_range", lambda ctx: original_range(ctx["clean"])),
+        ("query_range", lambda ctx: query(ctx["location_index"], COUNTRIES, *RANGE)),
+        ("original_pivot", lambda ctx: original_pivot(ctx["clean"])),
+        ("metric_matrix", lambda ctx: MetricMatrix(ctx["location_index"])),
+        ("matrix_select", lambda ctx: [ctx["metric_matrix"].frame(metric, COUNTRIES)
+                                       for metric in ["Total Cases", "Total Deaths"]]),
+        ("render_country", lambda ctx: to_png(country_chart(ctx["index_filter"][0], COUNTRIES[0]))),
+        ("render_comparison", lambda ctx: to_png(comparison_chart(ctx["matrix_select"][0],
+                                                                  "Total Cases"))),
+    ]
+
+
+def _status_kib(field):
+    """Return a ``/proc/self/status`` memory field in KiB."""
+    with open("/proc/self/status") as handle:
+        for line in handle:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def reset_peak_rss():
+    """Reset the process RSS high-water mark; return the current RSS in bytes or ``None``."""
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+        return _status_kib("VmRSS") * 1024
+    except (OSError, KeyError):
+        return None
+
+
+def measure(function, context, repeat):
+    """Return ``(result, best seconds, memory)`` of ``function(context)``.
+
+    ``memory`` holds the peak Python-heap MiB (``peak_mb``), the peak RSS
+    growth in MiB (``peak_rss_mb``, ``None`` where it cannot be measured)
+    and the Arrow memory the result retains in MiB (``arrow_mb``).
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function(context)
+        timings.append(time.perf_counter() - start)
+    del result
+    gc.collect()
+    tracemalloc.start()
+    function(context)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    arrow_before = pa.total_allocated_bytes()
+    rss_before = reset_peak_rss()
+    result = function(context)
+    peak_rss = None if rss_before is None else \
+        max(0, _status_kib("VmHWM") * 1024 - rss_before) / 2 ** 20
+    memory = {"peak_mb": peak / 2 ** 20, "peak_rss_mb": peak_rss,
+              "arrow_mb": (pa.total_allocated_bytes() - arrow_before) / 2 ** 20}
+    return result, min(timings), memory
+
+
+def run_scale(scale, repeat, data_dir=DATA_DIR, seed=0):
+    csv_path = ensure_dataset(scale, data_dir, seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_path = os.path.join(tmp_dir, "store.feather")
+        context = {}
+        for name, function in stages(csv_path, store_path):
+            context[name], seconds, memory = measure(function, context, repeat)
+            results.append({"scale": scale, "stage": name, "seconds": round(seconds, 6),
+                            **{key: None if value is None else round(value, 2)
+                               for key, value in memory.items()}})
+            rss = "n/a" if memory["peak_rss_mb"] is None else f"{memory['peak_rss_mb']:.1f}"
+            print(f"{scale:>4}x  {name:<22} {seconds * 1000:>10.1f} ms "
+                  f"{memory['peak_mb']:>8.1f} MiB heap {rss:>8} MiB RSS "
+                  f"{memory['arrow_mb']:>8.1f} MiB Arrow", flush=True)
+        rows = len(context["original_read_csv"])
+        compact = context["compact"]
+        print(f"{scale:>4}x  frame memory {compact.full_bytes / 2 ** 20:.1f} MiB full, "
+              f"{compact.compact_bytes / 2 ** 20:.1f} MiB compact", flush=True)
+    for result in results:
+        result.update(rows=rows, frame_mb=round(compact.full_bytes / 2 ** 20, 2),
+                      compact_frame_mb=round(compact.compact_bytes / 2 ** 20, 2))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=REPO_ROOT).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the time and memory ratio of each stage against a previous results file."""
+    with open(baseline_path) as handle:
+        baseline = {(r["scale"], r["stage"]): r for r in json.load(handle)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["scale"], result["stage"]))
+        if before and before["seconds"]:
+            line = (f"{result['scale']:>4}x  {result['stage']:<22} "
+                    f"time x{result['seconds'] / before['seconds']:.2f}  "
+                    f"memory x{result['peak_mb'] / max(before['peak_mb'], 1e-6):.2f}")
+            if result.get("peak_rss_mb") is not None and before.get("peak_rss_mb") is not None:
+                line += f"  RSS x{result['peak_rss_mb'] / max(before['peak_rss_mb'], 1e-6):.2f}"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pipeline stages.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], choices=sorted(SCALES),
+                        help="dataset scales to run (default: 1 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic data seed")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where generated CSVs are kept")
+    parser.add_argument("-o", "--output", default="bench-results.json", help="results JSON")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(scale, args.repeat, args.data_dir, args.seed))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.baseline:
+        compare(results, args.baseline)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Deterministic synthetic datasets with the OWID COVID-19 CSV schema.
+
+Each scale multiplies the number of locations, days and columns of a base
+dataset about the size of the original file (~44k rows, 41 columns).
+Aggregate rows such as "World" are included, and GDP per capita, HDI and
+totals have missing values like the real data.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# scale -> (locations, days, columns)
+SCALES = {
+    1: (210, 210, 41),
+    10: (660, 670, 50),
+    100: (2100, 2100, 60),
+}
+
+LEADING_COLUMNS = ["iso_code", "continent", "location", "date", "total_cases", "new_cases",
+                   "total_deaths", "new_deaths", "population", "gdp_per_capita",
+                   "human_development_index"]
+AGGREGATES = ["World", "International", "Europe", "Asia", "Africa"]
+
+
+def location_names(n):
+    names = AGGREGATES + ["Poland", "Italy"]
+    return (names + [f"Country {i:05d}" for i in range(n - len(names))])[:n]
+
+
+def generate(scale=1, seed=0):
+    """Return a synthetic OWID-schema DataFrame at ``scale``."""
+    n_locations, n_days, n_columns = SCALES[scale]
+    rng = np.random.default_rng(seed)
+    locations = np.array(location_names(n_locations), dtype=object)
+    dates = pd.date_range("2020-01-01", periods=n_days)
+
+    rates = rng.gamma(2.0, 50.0, n_locations)
+    starts = rng.integers(0, n_days // 3, n_locations)
+    day = np.arange(n_days)
+    new_cases = rng.poisson(rates[:, None] * (1 + np.sin(day[None, :] / 45.0 + rates[:, None])))
+    new_cases = np.where(day[None, :] >= starts[:, None], new_cases, 0)
+    total_cases = new_cases.cumsum(axis=1).astype("float64")
+    new_deaths = rng.binomial(new_cases, rng.uniform(0.005, 0.08, n_locations)[:, None])
+    total_deaths = new_deaths.cumsum(axis=1).astype("float64")
+    missing = rng.random(total_cases.shape) < 0.015
+    total_cases[missing] = np.nan
+    total_deaths[missing] = np.nan
+
+    gdp = rng.integers(600, 90_000, n_locations).astype("float64")
+    gdp[rng.random(n_locations) < 0.12] = np.nan
+    hdi = np.round(rng.uniform(0.35, 0.96, n_locations), 3)
+    hdi[rng.random(n_locations) < 0.14] = np.nan
+    population = rng.integers(50_000, 1_400_000_000, n_locations).astype("float64")
+
+    rows = n_locations * n_days
+    df = pd.DataFrame({
+        "iso_code": np.repeat([f"X{i:05d}" for i in range(n_locations)], n_days),
+        "continent": np.repeat(rng.choice(["Europe", "Asia", "Africa", "Americas"], n_locations),
+                               n_days),
+        "location": np.repeat(locations, n_days),
+        "date": np.tile(dates.strftime("%Y-%m-%d").to_numpy(), n_locations),
+        "total_cases": total_cases.ravel(),
+        "new_cases": new_cases.ravel().astype("float64"),
+        "total_deaths": total_deaths.ravel(),
+        "new_deaths": new_deaths.ravel().astype("float64"),
+        "population": np.repeat(population, n_days),
+        "gdp_per_capita": np.repeat(gdp, n_days),
+        "human_development_index": np.repeat(hdi, n_days),
+    })
+    for i in range(n_columns - len(LEADING_COLUMNS)):
+        df[f"indicator_{i:02d}"] = np.round(rng.random(rows) * 100, 2)
+    return df
+
+
+def ensure_dataset(scale, data_dir, seed=0):
+    """Write the dataset for ``scale`` to ``data_dir`` unless it exists; return its path."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"owid-synthetic-{scale}x-seed{seed}.csv")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        generate(scale, seed).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return path
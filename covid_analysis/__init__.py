@@ -0,0 +1,6 @@
+"""Data loading and analysis helpers for the COVID-19 Global Impact dashboard."""
+
+from covid_analysis.loader import clean_covid_data
+from covid_analysis.store import load_cleaned, read_raw
+
+__all__ = ["clean_covid_data", "load_cleaned", "read_raw"]
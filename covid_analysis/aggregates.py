@@ -0,0 +1,97 @@
+"""Per-country aggregate table.
+
+One vectorized pass over the cleaned frame produces, for every location, the
+latest date, totals and indicators, the maximum totals, the first-case date and the
+CFR %. The CFR ranking, top-N charts and scatter plots all read from it.
+
+:mod:`covid_analysis.incremental` keeps the table up to date as
+``*.latest.feather`` next to the store; :func:`load_country_summary` reads it
+from there while it matches the CSV.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.compact import load_compact
+from covid_analysis.index import SORT_COLUMNS, is_sorted, load_location_index, location_offsets
+from covid_analysis.loader import DATA_PATH, file_signature
+from covid_analysis.query import AGGREGATE_LOCATIONS
+from covid_analysis.store import is_current, read_store, sibling_path, store_path_for
+
+def latest_path_for(store_path):
+    """Return the per-country table kept next to ``store_path``."""
+    return sibling_path(store_path, ".latest.feather")
+
+
+LATEST_COLUMNS = ["Date", "Total Cases", "Total Deaths", "Gdp Per Capita", "Human Development Index"]
+
+
+def country_summary(df, indicators=None):
+    """Return the per-country aggregate table of a cleaned frame, indexed by location.
+
+    The frame is reduced in one vectorized pass over each location's
+    contiguous row range (``np.*.reduceat``), so it is only sorted by
+    ``(Location, Date)`` if it is not already, as the store is. Latest
+    columns missing from ``df`` are taken from ``indicators``, a table indexed
+    by location such as :attr:`covid_analysis.compact.CompactData.indicators`.
+    """
+    if not is_sorted(df):
+        df = df.sort_values(SORT_COLUMNS, ignore_index=True)
+    offsets = location_offsets(df["Location"].to_numpy())
+    bounds = np.array(list(offsets.values()), dtype="int64").reshape(-1, 2)
+    starts, latest = bounds[:, 0], bounds[:, 1] - 1
+
+    index = pd.Index(list(offsets), name="Location")
+    summary = pd.DataFrame({column: df[column].to_numpy()[latest] if column in df
+                            else indicators[column].reindex(index).to_numpy()
+                            for column in LATEST_COLUMNS}, index=index)
+    if not len(summary):
+        return summary.assign(**{column: pd.Series(dtype=dtype) for column, dtype in
+                                 [("Max Total Cases", "float64"), ("Max Total Deaths", "float64"),
+                                  ("First Case Date", df["Date"].dtype), ("CFR %", "float64")]})
+
+    cases = df["Total Cases"].to_numpy(dtype="float64")
+    summary["Max Total Cases"] = np.fmax.reduceat(cases, starts)
+    summary["Max Total Deaths"] = np.fmax.reduceat(df["Total Deaths"].to_numpy(dtype="float64"),
+                                                   starts)
+
+    dates = df["Date"].to_numpy()
+    no_case = np.iinfo("int64").max
+    first_case = np.minimum.reduceat(np.where(cases > 0, dates.view("int64"), no_case), starts)
+    summary["First Case Date"] = np.where(first_case == no_case, np.datetime64("NaT"),
+                                          first_case.view(dates.dtype))
+
+    summary["CFR %"] = ((summary["Total Deaths"] / summary["Total Cases"]) * 100).round(2)
+    return summary
+
+
+def top_locations(summary, column, n=5, exclude=AGGREGATE_LOCATIONS):
+    """Return the ``n`` largest values of ``column``, leaving out ``exclude``.
+
+    By default the OWID aggregates (World, continents, income groups, ...)
+    are left out, so only countries are ranked.
+    """
+    values = summary[column].drop(index=list(exclude), errors="ignore")
+    return values.sort_values(ascending=False).head(n)
+
+
+@lru_cache(maxsize=1)
+def _load_country_summary(csv_path, mtime_ns, size, compact):
+    latest_path = latest_path_for(store_path_for(csv_path))
+    if is_current(csv_path, latest_path):
+        return read_store(latest_path).set_index("Location")
+    if compact:
+        return country_summary(load_location_index(csv_path, compact=True).df,
+                               load_compact(csv_path).indicators)
+    return country_summary(load_location_index(csv_path).df)
+
+
+def load_country_summary(csv_path=DATA_PATH, compact=False):
+    """Return the per-country table of the cleaned dataset, memoized on the CSV version.
+
+    The table written by :mod:`covid_analysis.incremental` is used when it
+    matches the CSV; otherwise it is computed from the cleaned frame.
+    """
+    return _load_country_summary(*file_signature(csv_path), compact)
@@ -0,0 +1,159 @@
+"""Compact in-memory representation of the cleaned dataset.
+
+The cleaned frame repeats each location name as a Python string and the
+GDP per capita and HDI of a location on every one of its daily rows, all as
+float64. The compact form keeps:
+
+- ``daily``: ``Location`` as a categorical (sorted categories, so the frame
+  stays ordered by ``(Location, Date)``), ``Date``, and the totals in the
+  smallest dtype that holds them exactly;
+- ``indicators``: GDP per capita and HDI once per location, indexed by
+  location. An indicator that is not constant within some location stays
+  on the daily rows instead.
+
+:func:`compact_metrics` does the same for the derived metrics of
+:mod:`covid_analysis.metrics` (categorical ``Location``, float32 values).
+
+:func:`load_compact` builds it straight from the store and memoizes it on the
+CSV version, so every session of a server process shares one frame. It must
+not be modified; with pandas copy-on-write, an accidental write by a caller
+copies the affected column rather than changing the shared one.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.loader import DATA_PATH, file_signature
+from covid_analysis.store import read_cleaned, store_path_for
+
+ENV_VAR = "COVID_COMPACT"
+INDICATOR_COLUMNS = ["Gdp Per Capita", "Human Development Index"]
+TOTAL_COLUMNS = ["Total Cases", "Total Deaths"]
+
+
+def compact_mode_enabled():
+    """Return whether the app should use the compact frame (``COVID_COMPACT``, default on)."""
+    return os.environ.get(ENV_VAR, "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def smallest_dtype(values):
+    """Return the smallest dtype that represents ``values`` exactly.
+
+    Whole, non-missing values get the smallest signed integer type (signed
+    even for non-negative values, so differences of revised totals do not
+    wrap around); otherwise float32 is used when no value changes, and
+    float64 if not.
+    """
+    values = np.asarray(values, dtype="float64")
+    if len(values) == 0:
+        return np.dtype("int8")
+    finite = np.isfinite(values).all()
+    if finite and np.array_equal(values, np.trunc(values)):
+        low, high = values.min(), values.max()
+        for dtype in ["int8", "int16", "int32", "int64"]:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return np.dtype(dtype)
+    if np.array_equal(values.astype("float32").astype("float64"), values, equal_nan=True):
+        return np.dtype("float32")
+    return np.dtype("float64")
+
+
+def downcast(series):
+    """Return ``series`` converted to :func:`smallest_dtype` of its values."""
+    return series.astype(smallest_dtype(series.to_numpy()))
+
+
+def frame_bytes(df):
+    """Return the deep memory usage of ``df`` in bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _categorical_locations(locations):
+    return pd.Categorical(locations, categories=np.sort(locations.unique()))
+
+
+def compact_metrics(df):
+    """Return derived metrics with a categorical ``Location`` and float32 values."""
+    return pd.DataFrame({column: _categorical_locations(df[column]) if column == "Location"
+                         else df[column].to_numpy() if column == "Date"
+                         else df[column].to_numpy(dtype="float32")
+                         for column in df.columns}, index=df.index)
+
+
+def _constant_within_locations(df, column):
+    per_location = df.groupby("Location", sort=False, observed=True)[column]
+    return bool((per_location.nunique(dropna=False) <= 1).all())
+
+
+class CompactData:
+    """The compact daily frame and per-location indicators of a cleaned frame.
+
+    ``full_bytes`` is the deep memory usage of the frame it was built from,
+    kept so the saving can be reported after that frame has been released.
+    """
+
+    def __init__(self, df):
+        self.full_bytes = frame_bytes(df)
+        locations = df["Location"]
+        daily = {"Location": _categorical_locations(locations),
+                 "Date": df["Date"].to_numpy()}
+        daily.update({column: downcast(df[column]).to_numpy() for column in TOTAL_COLUMNS})
+
+        shared = [column for column in INDICATOR_COLUMNS if _constant_within_locations(df, column)]
+        for column in INDICATOR_COLUMNS:
+            if column not in shared:
+                daily[column] = df[column].to_numpy()
+        self.daily = pd.DataFrame(daily, index=df.index)
+        first = ~locations.duplicated()
+        self.indicators = pd.DataFrame({column: df[column].to_numpy()[first.to_numpy()]
+                                        for column in shared},
+                                       index=pd.Index(locations[first].to_numpy(), name="Location"))
+        self.indicators = self.indicators.sort_index()
+
+    @property
+    def compact_bytes(self):
+        return frame_bytes(self.daily) + frame_bytes(self.indicators)
+
+    def with_indicators(self, rows):
+        """Return ``rows`` of :attr:`daily` with the shared indicators joined back on."""
+        if not len(self.indicators.columns):
+            return rows
+        values = self.indicators.reindex(rows["Location"].astype(object))
+        return rows.assign(**{column: values[column].to_numpy()
+                              for column in self.indicators.columns})
+
+    def memory_report(self, others=None):
+        """Return the full and compact memory usage in MiB and the overall saving.
+
+        ``others`` maps further resident data to ``(full bytes, compact bytes)``
+        pairs, e.g. the derived metrics from
+        :func:`covid_analysis.metrics.metrics_memory`, so the report covers
+        everything the app keeps in memory.
+        """
+        parts = {"Cleaned data": (self.full_bytes, self.compact_bytes), **(others or {})}
+        report = pd.DataFrame(list(parts.values()), index=list(parts),
+                              columns=["Full MiB", "Compact MiB"]) / 2 ** 20
+        report.loc["Total"] = report.sum()
+        full, compact = report.loc["Total"]
+        return report.round(2), (1 - compact / full if full else 0.0)
+
+
+@lru_cache(maxsize=1)
+def _load_compact(csv_path, mtime_ns, size, store_path):
+    return CompactData(read_cleaned(csv_path, store_path))
+
+
+def load_compact(csv_path=DATA_PATH, store_path=None):
+    """Return the :class:`CompactData` of the cleaned dataset, memoized on the CSV version.
+
+    It is read from the store without keeping the full cleaned frame in
+    memory, and is shared between callers.
+    """
+    csv_path, mtime_ns, size = file_signature(csv_path)
+    return _load_compact(csv_path, mtime_ns, size,
+                         os.path.abspath(store_path or store_path_for(csv_path)))
+
@@ -0,0 +1,261 @@
+"""Correlations between socio-economic indicators and COVID-19 outcomes.
+
+Works on the per-country latest snapshot
+(:func:`covid_analysis.aggregates.country_summary`, without aggregates such
+as World): Pearson and Spearman matrices over the indicators and totals, and
+bootstrap confidence intervals for every pair, with the resamples split into
+independently seeded chunks across worker processes.
+
+GDP per capita and HDI are mode-imputed during cleaning, which piles many
+countries onto one repeated value. With ``exclude_imputed`` those values
+are treated as missing, so each pair uses only the countries where both
+values were reported. Results are memoized on the CSV version::
+
+    python -m covid_analysis.correlation --exclude-imputed
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.aggregates import load_country_summary
+from covid_analysis.loader import (DATA_PATH, IMPUTED_COLUMNS, drop_missing_totals, file_signature,
+                                   title_case)
+from covid_analysis.query import drop_aggregates
+from covid_analysis.store import read_raw
+
+COLUMNS = ["Gdp Per Capita", "Human Development Index", "Total Cases", "Total Deaths", "CFR %"]
+METHODS = ["pearson", "spearman"]
+BOOTSTRAP_SAMPLES = 2000
+CONFIDENCE = 0.95
+CHUNK_SAMPLES = 250
+SPAWN = multiprocessing.get_context("spawn")
+MIN_COUNTRIES = 3
+MODERATE = 0.3
+
+
+def imputed_cells(raw):
+    """Return, per location, whether each imputed column is missing in its latest raw row.
+
+    ``raw`` is an OWID frame as returned by :func:`~covid_analysis.store.read_raw`;
+    the result has the cleaned column names and is indexed by location.
+    """
+    latest = drop_missing_totals(raw).sort_values(["location", "date"], kind="stable") \
+        .drop_duplicates("location", keep="last")
+    return latest.set_index("location")[IMPUTED_COLUMNS].isna() \
+        .rename(columns=title_case).rename_axis("Location")
+
+
+def mask_imputed(snapshot, imputed):
+    """Return ``snapshot`` with the values flagged in ``imputed`` set to NaN."""
+    flags = imputed.reindex(snapshot.index, fill_value=False)
+    return snapshot.assign(**{column: snapshot[column].mask(flags[column].to_numpy())
+                              for column in imputed.columns if column in snapshot})
+
+
+def _row_pearson(x, y):
+    """Pearson correlation of each row pair of the 2-D arrays ``x`` and ``y``."""
+    x = x - x.mean(axis=1, keepdims=True)
+    y = y - y.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+
+
+def _row_ranks(values):
+    """Average ranks along each row, as ``Series.rank()`` computes them."""
+    return pd.DataFrame(values).rank(axis=1).to_numpy()
+
+
+def _bootstrap_chunk(args):
+    """Correlations of ``samples`` resamples of each pair, for every method."""
+    pairs, seed, samples = args
+    rng = np.random.default_rng(seed)
+    results = {}
+    for key, (x, y) in pairs.items():
+        rows = rng.integers(0, len(x), size=(samples, len(x)))
+        xs, ys = x[rows], y[rows]
+        results[key] = {"pearson": _row_pearson(xs, ys),
+                        "spearman": _row_pearson(_row_ranks(xs), _row_ranks(ys))}
+    return results
+
+
+_main_lock = threading.Lock()
+
+
+@contextmanager
+def _spawning_without_main():
+    """Keep processes spawned in this block from re-running the ``__main__`` script.
+
+    Streamlit runs the app as ``__main__``, so each spawned worker would run
+    the whole app before its first task; the bootstrap workers only need
+    this module.
+    """
+    if __name__ == "__main__":
+        yield
+        return
+    with _main_lock:
+        main = sys.modules["__main__"]
+        stub = sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            if sys.modules["__main__"] is stub:
+                sys.modules["__main__"] = main
+
+
+class CorrelationResult:
+    """Correlation matrices and bootstrap intervals of one snapshot.
+
+    ``intervals`` has one row per ``(method, x, y)`` pair with the estimate,
+    the lower and upper bounds and the number of countries used.
+    """
+
+    def __init__(self, pearson, spearman, intervals, excluded):
+        self.pearson = pearson
+        self.spearman = spearman
+        self.intervals = intervals
+        self.excluded = excluded
+
+    def interval(self, x, y, method="pearson"):
+        """Return the interval row of the pair ``x``/``y`` (in either order).
+
+        A pair with fewer than :data:`MIN_COUNTRIES` countries gets NaN bounds
+        and ``n`` 0.
+        """
+        for key in (method, x, y), (method, y, x):
+            if key in self.intervals.index:
+                return self.intervals.loc[key]
+        return pd.Series({"estimate": np.nan, "low": np.nan, "high": np.nan, "n": 0},
+                         name=(method, x, y))
+
+
+def correlations(snapshot, columns=COLUMNS, imputed=None, samples=BOOTSTRAP_SAMPLES,
+                 confidence=CONFIDENCE, seed=0, workers=None):
+    """Return the :class:`CorrelationResult` of ``columns`` of a country snapshot.
+
+    Values flagged in ``imputed`` (see :func:`imputed_cells`) are left out.
+    Bootstrap resamples are drawn in chunks of :data:`CHUNK_SAMPLES`, each
+    seeded from ``seed``, so the intervals do not depend on ``workers``.
+    Workers are spawned rather than forked, so this is safe to call from a
+    thread of a server such as Streamlit.
+    """
+    columns = [column for column in columns if column in snapshot]
+    data = snapshot[columns].astype("float64")
+    excluded = 0
+    if imputed is not None:
+        masked = mask_imputed(data, imputed)
+        excluded = int((masked.isna() & data.notna()).sum().sum())
+        data = masked
+    matrices = {method: data.corr(method=method) for method in METHODS}
+
+    pairs = {}
+    for x, y in itertools.combinations(columns, 2):
+        both = data[[x, y]].dropna()
+        if len(both) >= MIN_COUNTRIES:
+            pairs[(x, y)] = (both[x].to_numpy(), both[y].to_numpy())
+
+    chunks = [CHUNK_SAMPLES] * (samples // CHUNK_SAMPLES)
+    if samples % CHUNK_SAMPLES:
+        chunks.append(samples % CHUNK_SAMPLES)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(pairs, chunk_seed, chunk) for chunk_seed, chunk in zip(seeds, chunks)]
+    if workers == 1 or len(tasks) <= 1 or not pairs:
+        results = list(map(_bootstrap_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=SPAWN) as executor:
+            # The workers are started as the tasks are submitted.
+            with _spawning_without_main():
+                futures = [executor.submit(_bootstrap_chunk, task) for task in tasks]
+            results = [future.result() for future in futures]
+
+    alpha = (1 - confidence) / 2
+    rows = []
+    for (x, y), (values, _) in pairs.items():
+        for method in METHODS:
+            estimates = np.concatenate([result[(x, y)][method] for result in results])
+            low, high = np.nanquantile(estimates, [alpha, 1 - alpha]) \
+                if np.isfinite(estimates).any() else (np.nan, np.nan)
+            rows.append({"method": method, "x": x, "y": y,
+                         "estimate": matrices[method].loc[x, y], "low": low, "high": high,
+                         "n": len(values)})
+    intervals = pd.DataFrame(rows, columns=["method", "x", "y", "estimate", "low", "high", "n"]) \
+        .set_index(["method", "x", "y"])
+    return CorrelationResult(matrices["pearson"], matrices["spearman"], intervals, excluded)
+
+
+@lru_cache(maxsize=1)
+def _imputed_cells(csv_path, mtime_ns, size):
+    return imputed_cells(read_raw(csv_path))
+
+
+@lru_cache(maxsize=2)
+def _load_correlations(csv_path, mtime_ns, size, exclude_imputed, samples, seed, workers,
+                       compact):
+    imputed = _imputed_cells(csv_path, mtime_ns, size) if exclude_imputed else None
+    snapshot = drop_aggregates(load_country_summary(csv_path, compact))
+    return correlations(snapshot, imputed=imputed, samples=samples, seed=seed, workers=workers)
+
+
+def load_correlations(csv_path=DATA_PATH, exclude_imputed=False, samples=BOOTSTRAP_SAMPLES,
+                      seed=0, workers=None, compact=False):
+    """Return the :class:`CorrelationResult` of the dataset, memoized on the CSV version.
+
+    ``compact`` reads the snapshot from the compact frame (same values).
+    """
+    return _load_correlations(*file_signature(csv_path), exclude_imputed, samples, seed,
+                              workers, compact)
+
+
+def strength(r):
+    """Describe the size of a correlation coefficient in words."""
+    if not np.isfinite(r):
+        return "no measurable"
+    size = abs(r)
+    if size < 0.1:
+        return "almost no"
+    label = "a weak" if size < MODERATE else "a moderate" if size < 0.5 else "a strong"
+    return f"{label} {'positive' if r > 0 else 'negative'}"
+
+
+def describe(result, x, y, method="pearson"):
+    """Return a markdown sentence on the correlation of ``x`` and ``y``."""
+    row = result.interval(x, y, method)
+    if not row["n"]:
+        return (f"{method.title()} correlation **n/a** (fewer than {MIN_COUNTRIES} countries), "
+                f"i.e. **{strength(np.nan)} relationship**")
+    return (f"{method.title()} correlation **{row['estimate']:.3f}** "
+            f"({CONFIDENCE:.0%} CI {row['low']:.3f} to {row['high']:.3f}, "
+            f"n = {int(row['n']):,}), i.e. **{strength(row['estimate'])} relationship**")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Correlate indicators with COVID-19 outcomes.")
+    parser.add_argument("--data", default=DATA_PATH, help="OWID CSV (default: %(default)s)")
+    parser.add_argument("--exclude-imputed", action="store_true",
+                        help="leave out mode-imputed GDP per capita and HDI values")
+    parser.add_argument("--samples", type=int, default=BOOTSTRAP_SAMPLES,
+                        help="bootstrap resamples (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="bootstrap seed")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    result = load_correlations(args.data, args.exclude_imputed, args.samples, args.seed,
+                               args.workers)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print("Pearson\n", result.pearson.round(3), "\n\nSpearman\n", result.spearman.round(3),
+              "\n\nIntervals\n", result.intervals.round(3))
+    if args.exclude_imputed:
+        print(f"\n{result.excluded} imputed values excluded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Chart rendering with a rendered-figure cache and LTTB downsampling.
+
+Charts are drawn on plain :class:`matplotlib.figure.Figure` objects (no
+pyplot global state, so sessions can render concurrently), rendered to PNG
+and cached under ``(data version, chart type, parameters)``. Long daily
+series are reduced with Largest-Triangle-Three-Buckets before plotting,
+which keeps peaks and troughs while bounding the points drawn per line.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.figure import Figure
+
+MAX_POINTS = 500
+# Comparison charts name at most this many locations in the title.
+TITLE_LOCATIONS = 3
+
+
+def lttb(x, y, n_out):
+    """Return the indices of ``n_out`` points of ``(x, y)`` chosen by LTTB.
+
+    The first and last points are always kept. If there are no more than
+    ``n_out`` points, all indices are returned.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype("int64")
+    selected = np.empty(n_out, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(series, max_points=MAX_POINTS):
+    """Return at most ``max_points`` points of a date- or number-indexed series, chosen by LTTB."""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    x = series.index.to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype("int64")
+    return series.iloc[lttb(x, series.to_numpy(), max_points)]
+
+
+def to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Thread-safe LRU cache of rendered PNGs keyed on ``(version, chart, params)``."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, chart, params, draw):
+        """Return the cached PNG for the key, calling ``draw()`` for a Figure on a miss."""
+        key = (version, chart, params)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        png = to_png(draw())
+        with self._lock:
+            self._items[key] = png
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return png
+
+
+figure_cache = FigureCache()
+
+
+def country_chart(df_country, country, max_points=MAX_POINTS):
+    """Total cases and deaths over time for one location."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    df_country = df_country.set_index("Date")
+    for column in ["Total Cases", "Total Deaths"]:
+        downsample(df_country[column], max_points).plot(kind="line", ax=ax, label=column)
+    ax.set_ylabel("Count")
+    ax.set_title(f"COVID-19 Cases & Deaths in {country}")
+    ax.legend()
+    return fig
+
+
+def daily_chart(df_metrics, country, metric="New Cases", window=7, max_points=MAX_POINTS):
+    """Daily values of ``metric`` for one location with their trailing mean."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    df_metrics = df_metrics.set_index("Date")
+    downsample(df_metrics[metric], max_points).plot(kind="line", ax=ax, alpha=0.4, label=metric)
+    downsample(df_metrics[f"{metric} {window}d"], max_points) \
+        .plot(kind="line", ax=ax, label=f"{window}-day average")
+    ax.set_ylabel(metric)
+    ax.set_title(f"COVID-19 Daily {metric} in {country}")
+    ax.legend()
+    return fig
+
+
+def comparison_chart(frame, metric, ylabel=None, xlabel=None, max_points=MAX_POINTS):
+    """One line of ``metric`` per column (location) of ``frame``."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    for location in frame.columns:
+        downsample(frame[location], max_points).plot(kind="line", ax=ax, label=location)
+    if len(frame.columns):
+        ax.legend(title="Location", ncol=1 + (len(frame.columns) - 1) // 15)
+    ax.set_ylabel(ylabel or metric)
+    if xlabel:
+        ax.set_xlabel(xlabel)
+    ax.set_title(comparison_title(metric, list(frame.columns)))
+    return fig
+
+
+def comparison_title(metric, locations, max_names=TITLE_LOCATIONS):
+    """Name up to ``max_names`` locations in the title; more are left to the legend."""
+    if len(locations) == 1:
+        return f"COVID-19 {metric} in {locations[0]}"
+    if 1 < len(locations) <= max_names:
+        return f"COVID-19 {metric}: {' vs '.join(locations)}"
+    return f"COVID-19 {metric} by location"
+
+
+def bar_chart(values, color, xlabel, title, figsize=(12, 6)):
+    """Horizontal bars of a ranked Series or single-column DataFrame."""
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    values.plot(kind="barh", color=color, ax=ax)
+    ax.set_ylabel("Country")
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    return fig
+
+
+def scatter_chart(df, x, y, color, xlabel, ylabel, title):
+    """Scatter of two per-country columns."""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    df.plot(kind="scatter", x=x, y=y, alpha=0.6, color=color, grid=True, ax=ax)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    return fig
+
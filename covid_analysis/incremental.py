@@ -0,0 +1,199 @@
+"""Incremental ingestion of updated OWID CSVs.
+
+Next to the cleaned store (see :mod:`covid_analysis.store`) two files are
+kept:
+
+- ``*.snapshot.feather``: the last ingested rows after dropping missing
+  totals but *before* imputation, so imputed values can be refreshed when the
+  mode moves. Its metadata holds the value counts of GDP per capita and HDI,
+  from which the imputation modes are maintained without rescanning it;
+- ``*.latest.feather``: the per-country table of
+  :func:`~covid_analysis.aggregates.country_summary`, read by
+  :func:`~covid_analysis.aggregates.load_country_summary`.
+
+The derived metrics file of :mod:`covid_analysis.metrics` is updated
+alongside.
+
+Each ingest compares the new CSV with the snapshot by ``(location, date)``,
+applies only the added, changed and removed rows, and recomputes the
+per-country results and derived metrics only for locations whose data
+changed. The store and the snapshot are still rewritten as a whole (Feather
+files cannot be appended to).
+
+Every file records the source CSV it was built from, and the snapshot is
+written last, so it marks a completed ingest. If an ingest is interrupted,
+the outputs no longer match the snapshot and the next ingest rebuilds them
+from scratch. Run it after downloading a new CSV with::
+
+    python -m covid_analysis.incremental owid-covid-data.csv
+"""
+
+import argparse
+import json
+
+import pandas as pd
+
+from covid_analysis.aggregates import country_summary, latest_path_for
+from covid_analysis.loader import (DATA_PATH, IMPUTED_COLUMNS, drop_missing_totals,
+                                   impute_and_rename, read_owid_csv)
+from covid_analysis.metrics import (derive_metrics, has_current_version, metrics_metadata,
+                                    metrics_path_for, update_metrics)
+from covid_analysis.store import (HASH_KEY, file_sha256, read_store, read_store_metadata,
+                                  sibling_path, source_metadata, store_path_for, write_store)
+
+KEY_COLUMNS = ["location", "date"]
+VALUE_COLUMNS = ["total_cases", "total_deaths", "gdp_per_capita", "human_development_index"]
+COUNTS_KEY = b"imputation_counts"
+
+
+def snapshot_path_for(store_path):
+    """Return the snapshot kept next to ``store_path``."""
+    return sibling_path(store_path, ".snapshot.feather")
+
+
+def value_counts(df):
+    return {column: df[column].value_counts() for column in IMPUTED_COLUMNS}
+
+
+def update_counts(counts, added, removed):
+    """Add the value counts of ``added`` rows and subtract those of ``removed``."""
+    updated = {}
+    for column in IMPUTED_COLUMNS:
+        merged = counts[column].add(added[column].value_counts(), fill_value=0) \
+                               .sub(removed[column].value_counts(), fill_value=0)
+        updated[column] = merged[merged > 0].astype("int64")
+    return updated
+
+
+def modes_from_counts(counts):
+    """Return the mode of each column, breaking ties like ``Series.mode()[0]``."""
+    return {column: counts[column][counts[column] == counts[column].max()].index.min()
+            for column in IMPUTED_COLUMNS}
+
+
+def read_counts(metadata):
+    """Return the value counts stored in the snapshot ``metadata``."""
+    state = json.loads(metadata[COUNTS_KEY])
+    return {column: pd.Series(dict(state[column]), dtype="int64") for column in IMPUTED_COLUMNS}
+
+
+def counts_metadata(counts):
+    """Return ``counts`` as snapshot metadata, so they are replaced together with it."""
+    state = {column: [[float(value), int(count)] for value, count in counts[column].items()]
+             for column in IMPUTED_COLUMNS}
+    return {COUNTS_KEY: json.dumps(state).encode()}
+
+
+def _row_hashes(df):
+    return pd.Series(pd.util.hash_pandas_object(df[VALUE_COLUMNS], index=False).to_numpy(),
+                     index=pd.MultiIndex.from_frame(df[KEY_COLUMNS]))
+
+
+def diff_rows(old, new):
+    """Return the ``(location, date)`` keys added, changed and removed in ``new``."""
+    old_hashes, new_hashes = _row_hashes(old), _row_hashes(new)
+    common = old_hashes.index.intersection(new_hashes.index)
+    changed = common[old_hashes.loc[common].to_numpy() != new_hashes.loc[common].to_numpy()]
+    added = new_hashes.index.difference(old_hashes.index)
+    removed = old_hashes.index.difference(new_hashes.index)
+    return added, changed, removed
+
+
+def _select(df, keys):
+    return df.set_index(KEY_COLUMNS).loc[keys].reset_index()
+
+
+def _write_outputs(csv_path, store_path, snapshot, counts, cleaned, df_latest, metrics):
+    sha256 = file_sha256(csv_path)
+    metadata = source_metadata(csv_path, sha256)
+    write_store(df_latest.reset_index(), latest_path_for(store_path), metadata)
+    write_store(metrics, metrics_path_for(store_path), metrics_metadata(csv_path, sha256))
+    write_store(cleaned, store_path, metadata)
+    # Last: the snapshot commits the ingest, together with its value counts.
+    write_store(snapshot, snapshot_path_for(store_path), {**metadata, **counts_metadata(counts)})
+
+
+def _snapshot_metadata(store_path):
+    """Return the metadata of the snapshot if all outputs were built from the same CSV.
+
+    Returns ``None`` when the snapshot is missing or an output is missing or
+    does not match it, e.g. after an interrupted ingest or a rebuilt store.
+    """
+    metadata = read_store_metadata(snapshot_path_for(store_path))
+    if not metadata or COUNTS_KEY not in metadata or HASH_KEY not in metadata:
+        return None
+    for path in (store_path, latest_path_for(store_path), metrics_path_for(store_path)):
+        if (read_store_metadata(path) or {}).get(HASH_KEY) != metadata[HASH_KEY]:
+            return None
+    return metadata
+
+
+def ingest(csv_path=DATA_PATH, store_path=None):
+    """Bring the store up to date with ``csv_path`` and return a summary dict.
+
+    Without a complete previous ingest everything is ingested from scratch.
+    """
+    store_path = store_path or store_path_for(csv_path)
+    incoming = drop_missing_totals(read_owid_csv(csv_path))
+    incoming = incoming.sort_values(KEY_COLUMNS, ignore_index=True)
+
+    metadata = _snapshot_metadata(store_path)
+    if metadata is None:
+        counts = value_counts(incoming)
+        cleaned = impute_and_rename(incoming, modes_from_counts(counts))
+        df_latest = country_summary(cleaned)
+        _write_outputs(csv_path, store_path, incoming, counts, cleaned, df_latest,
+                       derive_metrics(cleaned))
+        return {"added": len(incoming), "changed": 0, "removed": 0,
+                "locations": sorted(df_latest.index)}
+
+    snapshot = read_store(snapshot_path_for(store_path))
+    old_counts = read_counts(metadata)
+    added, changed, removed = diff_rows(snapshot, incoming)
+
+    outgoing = _select(snapshot, changed.append(removed))
+    delta = _select(incoming, added.append(changed))
+    counts = update_counts(old_counts, delta, outgoing)
+
+    kept = snapshot.set_index(KEY_COLUMNS).drop(changed.append(removed)).reset_index()
+    snapshot = pd.concat([kept, delta], ignore_index=True) \
+                 .sort_values(KEY_COLUMNS, ignore_index=True)
+
+    locations = set(delta["location"]) | set(outgoing["location"])
+    old_modes, modes = modes_from_counts(old_counts), modes_from_counts(counts)
+    for column in IMPUTED_COLUMNS:
+        if old_modes[column] != modes[column]:
+            locations |= set(snapshot.loc[snapshot[column].isna(), "location"])
+
+    cleaned = impute_and_rename(snapshot, modes)
+    affected = cleaned[cleaned["Location"].isin(locations)]
+    df_latest = read_store(latest_path_for(store_path)).set_index("Location")
+    df_latest = pd.concat([
+        df_latest.drop(index=list(locations), errors="ignore"),
+        country_summary(affected),
+    ]).sort_index()
+    metrics_path = metrics_path_for(store_path)
+    if has_current_version(metrics_path):
+        metrics = update_metrics(read_store(metrics_path), affected, locations)
+    else:
+        metrics = derive_metrics(cleaned)
+
+    _write_outputs(csv_path, store_path, snapshot, counts, cleaned, df_latest, metrics)
+    return {"added": len(added), "changed": len(changed), "removed": len(removed),
+            "locations": sorted(locations)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest new rows of an updated OWID CSV.")
+    parser.add_argument("csv", nargs="?", default=DATA_PATH, help="updated OWID CSV")
+    parser.add_argument("-o", "--output", help="store path (default: next to the CSV)")
+    args = parser.parse_args(argv)
+
+    summary = ingest(args.csv, args.output)
+    print(f"{summary['added']} added, {summary['changed']} changed, "
+          f"{summary['removed']} removed rows; "
+          f"{len(summary['locations'])} locations recomputed")
+
+
+if __name__ == "__main__":
+    main()
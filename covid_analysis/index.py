@@ -0,0 +1,88 @@
+"""Location-partitioned index over the cleaned dataset.
+
+The frame is kept sorted by ``(Location, Date)`` so each location occupies a
+contiguous, already date-ordered run of rows. The index maps every location
+to its ``(start, stop)`` row offsets, making a country's series an O(1)
+lookup plus a positional slice instead of a boolean scan and a sort.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.compact import load_compact
+from covid_analysis.loader import DATA_PATH, file_signature
+from covid_analysis.store import load_cleaned
+
+SORT_COLUMNS = ["Location", "Date"]
+
+
+def is_sorted(df, columns=SORT_COLUMNS):
+    """Return whether ``df`` is sorted by ``columns`` (lexicographically)."""
+    return pd.MultiIndex.from_frame(df[columns]).is_monotonic_increasing
+
+
+def location_offsets(locations):
+    """Return ``{location: (start, stop)}`` for a grouped array of locations."""
+    locations = np.asarray(locations)
+    if len(locations) == 0:
+        return {}
+    starts = np.flatnonzero(locations[1:] != locations[:-1]) + 1
+    starts = np.concatenate(([0], starts))
+    stops = np.concatenate((starts[1:], [len(locations)]))
+    return {locations[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+
+class LocationIndex:
+    """Maps each location of a cleaned frame to its contiguous row slice.
+
+    ``df`` is sorted by ``(Location, Date)`` only if it is not already, so an
+    ordered frame (such as the store) is used as is, without a copy.
+    """
+
+    def __init__(self, df):
+        if not is_sorted(df):
+            df = df.sort_values(SORT_COLUMNS, ignore_index=True)
+        self.df = df
+        self._offsets = location_offsets(df["Location"].to_numpy())
+
+    @property
+    def locations(self):
+        return list(self._offsets)
+
+    def __contains__(self, location):
+        return location in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def position(self, location, default=0):
+        """Return the position of ``location`` in :attr:`locations`, or ``default``."""
+        return self.locations.index(location) if location in self else default
+
+    def bounds(self, location):
+        """Return the ``(start, stop)`` row offsets of ``location``."""
+        return self._offsets[location]
+
+    def series(self, location, columns=None):
+        """Return the date-ordered rows of ``location`` as a positional slice."""
+        start, stop = self._offsets[location]
+        rows = self.df.iloc[start:stop]
+        return rows if columns is None else rows[columns]
+
+
+@lru_cache(maxsize=1)
+def _load_location_index(csv_path, mtime_ns, size, compact):
+    if compact:
+        return LocationIndex(load_compact(csv_path).daily)
+    return LocationIndex(load_cleaned(csv_path))
+
+
+def load_location_index(csv_path=DATA_PATH, compact=False):
+    """Return the location index of the cleaned dataset, memoized on the CSV version.
+
+    With ``compact``, the index is over the daily frame of
+    :func:`covid_analysis.compact.load_compact` (no per-row indicators).
+    """
+    return _load_location_index(*file_signature(csv_path), compact)
@@ -0,0 +1,179 @@
+"""Opt-in per-section timing and memory instrumentation for the dashboard.
+
+Enable it for every run with the ``COVID_PROFILE=1`` environment variable.
+The ``?profile=1`` query parameter enables it for a single visitor only if
+the operator allows that with ``COVID_PROFILE_QUERY=1``. Each wrapped section
+records its elapsed time, the memory allocated while it ran (via
+:mod:`tracemalloc`) and an optional row count. The results of the current run
+are shown in a sidebar panel together with p50/p95 timings over the recent
+runs of this process, and are appended as JSON lines to ``COVID_PROFILE_LOG``
+when it is set.
+
+Allocations are traced only while a profiled section is running, so other
+sessions are not slowed down in between. Tracing is process-wide, so the
+memory figures are left empty (NaN) when another script run, profiled or
+not, was running or started during the section; the remaining figures can
+still include allocations of the server's own threads.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+ENV_VAR = "COVID_PROFILE"
+QUERY_ENV_VAR = "COVID_PROFILE_QUERY"
+LOG_ENV_VAR = "COVID_PROFILE_LOG"
+QUERY_PARAM = "profile"
+HISTORY_SIZE = 500
+SCRIPT_THREAD = "ScriptRunner.scriptThread"
+
+_history = defaultdict(lambda: deque(maxlen=HISTORY_SIZE))
+_history_lock = threading.Lock()
+_log_lock = threading.Lock()
+_trace_lock = threading.Lock()
+_active_sections = 0
+_sections_started = 0
+_runs_started = 0
+
+
+def _truthy(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def profiling_enabled():
+    """Return whether instrumentation is on, by environment or (if allowed) query parameter."""
+    if _truthy(os.environ.get(ENV_VAR, "")):
+        return True
+    return _truthy(os.environ.get(QUERY_ENV_VAR, "")) and \
+        _truthy(st.query_params.get(QUERY_PARAM, ""))
+
+
+def _other_script_runs():
+    """Return whether a script run of another session is in progress."""
+    current = threading.current_thread()
+    return any(thread.name == SCRIPT_THREAD and thread is not current
+               for thread in threading.enumerate())
+
+
+def _count_run():
+    global _runs_started
+    with _trace_lock:
+        _runs_started += 1
+
+
+def _start_tracing():
+    """Start tracing if no section is running; return a token for :func:`_stop_tracing`."""
+    global _active_sections, _sections_started
+    with _trace_lock:
+        if _active_sections == 0:
+            tracemalloc.start()
+        _active_sections += 1
+        _sections_started += 1
+        alone = _active_sections == 1 and not _other_script_runs()
+        if alone:
+            tracemalloc.reset_peak()
+        return _sections_started, _runs_started, alone
+
+
+def _stop_tracing(token):
+    """Return ``(current, peak)`` traced bytes, or ``None`` if other script runs overlapped.
+
+    Tracing stops once no profiled section is running.
+    """
+    global _active_sections
+    number, runs, alone = token
+    with _trace_lock:
+        alone = alone and _sections_started == number and _runs_started == runs \
+            and not _other_script_runs()
+        memory = tracemalloc.get_traced_memory() if alone else None
+        _active_sections -= 1
+        if _active_sections == 0:
+            tracemalloc.stop()
+        return memory
+
+
+class Profiler:
+    """Collects per-section measurements for one run of the script.
+
+    When disabled, :meth:`section` still yields a dict (so callers can set
+    ``rows`` unconditionally) but measures nothing.
+    """
+
+    def __init__(self, enabled, log_path=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex
+        self.records = []
+
+    @contextmanager
+    def section(self, name):
+        record = {"section": name}
+        if not self.enabled:
+            yield record
+            return
+        token = _start_tracing()
+        before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            memory = _stop_tracing(token)
+            after, peak = memory if memory is not None else (np.nan, np.nan)
+            record.update(seconds=elapsed, allocated_mb=(after - before) / 2 ** 20,
+                          peak_mb=(peak - before) / 2 ** 20)
+            self.records.append(record)
+            with _history_lock:
+                _history[name].append(elapsed)
+
+    def frame(self):
+        """Return this run's measurements with p50/p95 over recent runs."""
+        df = pd.DataFrame(self.records, columns=["section", "seconds", "allocated_mb",
+                                                 "peak_mb", "rows"])
+        df["rows"] = df["rows"].astype("Int64")
+        with _history_lock:
+            history = {name: np.array(_history[name]) for name in df["section"]}
+        df["p50"] = [np.percentile(history[name], 50) for name in df["section"]]
+        df["p95"] = [np.percentile(history[name], 95) for name in df["section"]]
+        return df.set_index("section")
+
+    def write_log(self):
+        if not self.log_path:
+            return
+        entry = {"timestamp": datetime.now(timezone.utc).isoformat(), "run": self.run_id,
+                 "sections": self.records}
+        line = json.dumps(entry, default=str) + "\n"
+        with _log_lock, open(self.log_path, "a") as handle:
+            handle.write(line)
+
+    def finish(self):
+        """Show the sidebar panel and append to the log; no-op when disabled."""
+        if not self.enabled:
+            return
+        df = self.frame()
+        st.sidebar.markdown("### Performance")
+        st.sidebar.caption(f"Total {df['seconds'].sum() * 1000:,.0f} ms over {len(df)} sections")
+        st.sidebar.dataframe((df[["seconds", "p50", "p95"]] * 1000).round(1)
+                             .rename(columns=lambda column: f"{column} ms")
+                             .join(df[["allocated_mb", "peak_mb", "rows"]].round(2)))
+        self.write_log()
+
+
+def start_profiler():
+    """Return a :class:`Profiler` configured from the environment and query string.
+
+    Call it at the start of every run, profiled or not, so that profiled
+    sections can tell when another run started while they were measured.
+    """
+    _count_run()
+    return Profiler(profiling_enabled(), os.environ.get(LOG_ENV_VAR))
@@ -0,0 +1,83 @@
+"""Loading and cleaning of the OWID COVID-19 CSV.
+
+Only the six analysis columns are read, with explicit dtypes and ``date``
+parsed during the read. Results are memoized on the file's path, mtime and
+size, so reruns with an unchanged file are free and any change to the CSV
+invalidates the cache. Only the latest version is kept, here and in the
+other loaders of the package, so an updated CSV replaces the cached frames
+instead of piling up next to them.
+"""
+
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+DATA_PATH = "owid-covid-data.csv"
+
+RAW_COLUMNS = ["location", "date", "total_cases",
+               "total_deaths", "gdp_per_capita", "human_development_index"]
+
+RAW_DTYPES = {
+    "location": "str",
+    "total_cases": "float64",
+    "total_deaths": "float64",
+    "gdp_per_capita": "float64",
+    "human_development_index": "float64",
+}
+
+TOTAL_COLUMNS = ["total_cases", "total_deaths"]
+IMPUTED_COLUMNS = ["gdp_per_capita", "human_development_index"]
+
+
+def file_signature(path):
+    """Return ``(absolute path, mtime in ns, size)`` identifying a file version."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def read_owid_csv(path):
+    """Read the analysis columns of an OWID CSV with explicit dtypes."""
+    return pd.read_csv(path, usecols=RAW_COLUMNS, dtype=RAW_DTYPES,
+                       parse_dates=["date"])[RAW_COLUMNS]
+
+
+def clean_covid_data(df):
+    """Apply the cleaning steps of the analysis and return a new frame.
+
+    Rows without totals are dropped, GDP per capita and HDI are imputed with
+    their mode and columns are renamed to title case. The input is not
+    modified, so it is safe to pass a cached frame.
+    """
+    df = drop_missing_totals(df)
+    return impute_and_rename(df, imputation_modes(df))
+
+
+def drop_missing_totals(df):
+    return df.dropna(subset=TOTAL_COLUMNS)
+
+
+def imputation_modes(df):
+    return {column: df[column].mode()[0] for column in IMPUTED_COLUMNS}
+
+
+def impute_and_rename(df, modes):
+    """Fill GDP per capita and HDI with ``modes`` and title-case the columns."""
+    return df.fillna(modes).rename(columns=title_case)
+
+
+def title_case(column):
+    return column.replace("_", " ").title()
+
+
+@lru_cache(maxsize=1)
+def _load_population(path, mtime_ns, size):
+    df = pd.read_csv(path, usecols=["location", "population"],
+                     dtype={"location": "str", "population": "float64"})
+    return df.dropna().groupby("location")["population"].last()
+
+
+def load_population(path=DATA_PATH):
+    """Return the latest population of each location, memoized on the file version."""
+    return _load_population(*file_signature(path))
@@ -0,0 +1,107 @@
+"""Dense date x location matrices for N-way comparisons.
+
+Each metric is held as a NumPy array with one row per date and one column
+per location, NaN where a location has no row for that day. Selecting any
+set of countries is then column indexing instead of a filter and a pivot,
+and alignment by days since the 100th case or per-capita scaling are array
+operations over the selected columns.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.index import load_location_index
+from covid_analysis.loader import DATA_PATH, file_signature
+
+METRICS = ["Total Cases", "Total Deaths"]
+
+
+class MetricMatrix:
+    """Aligned ``date x location`` arrays of the metrics of a cleaned frame."""
+
+    def __init__(self, index, metrics=METRICS):
+        df = index.df
+        self.dates = pd.DatetimeIndex(np.unique(df["Date"].to_numpy()))
+        self.locations = pd.Index(index.locations)
+        rows = self.dates.get_indexer(df["Date"])
+        lengths = [stop - start for start, stop in map(index.bounds, self.locations)]
+        columns = np.repeat(np.arange(len(self.locations)), lengths)
+        self.values = {}
+        for metric in metrics:
+            values = np.full((len(self.dates), len(self.locations)), np.nan)
+            values[rows, columns] = df[metric].to_numpy(dtype="float64")
+            values.setflags(write=False)
+            self.values[metric] = values
+
+    @property
+    def nbytes(self):
+        """Memory held by the arrays and their date and location labels, in bytes."""
+        return int(sum(values.nbytes for values in self.values.values())
+                   + self.dates.memory_usage(deep=True) + self.locations.memory_usage(deep=True))
+
+    def positions(self, locations):
+        positions = self.locations.get_indexer(locations)
+        if (positions < 0).any():
+            missing = [location for location, position in zip(locations, positions) if position < 0]
+            raise KeyError(f"Unknown locations: {missing}")
+        return positions
+
+    def frame(self, metric, locations):
+        """Return ``metric`` for ``locations`` as a date-indexed DataFrame."""
+        locations = list(locations)
+        return pd.DataFrame(self.values[metric][:, self.positions(locations)],
+                            index=self.dates, columns=locations)
+
+    def per_capita(self, metric, locations, population, per=1_000_000):
+        """Return ``metric`` per ``per`` people, with ``population`` a Series by location."""
+        frame = self.frame(metric, locations)
+        return frame / population.reindex(frame.columns).to_numpy() * per
+
+    def since_threshold(self, frame, threshold=100, by="Total Cases"):
+        """Re-index the columns of ``frame`` by days since ``by`` first reached ``threshold``.
+
+        ``frame`` is a date-indexed DataFrame from :meth:`frame` or
+        :meth:`per_capita`. Locations that never reach the threshold are
+        dropped.
+        """
+        reference = self.values[by][:, self.positions(frame.columns)]
+        reached = np.nan_to_num(reference, nan=-np.inf) >= threshold
+        keep = reached.any(axis=0)
+        first = reached.argmax(axis=0)[keep]
+        values = frame.to_numpy()[:, keep]
+
+        days = np.arange(len(self.dates) - first.min()) if len(first) else np.arange(0)
+        rows = first[None, :] + days[:, None]
+        inside = rows < len(self.dates)
+        rows = np.minimum(rows, len(self.dates) - 1)
+        aligned = np.where(inside, values[rows, np.arange(values.shape[1])], np.nan)
+        return pd.DataFrame(aligned, index=pd.RangeIndex(len(days), name="Days"),
+                            columns=frame.columns[keep])
+
+
+@lru_cache(maxsize=1)
+def _load_metric_matrix(csv_path, mtime_ns, size, compact):
+    return MetricMatrix(load_location_index(csv_path, compact))
+
+
+def load_metric_matrix(csv_path=DATA_PATH, compact=False):
+    """Return the metric matrices of the cleaned dataset, memoized on the CSV version.
+
+    ``compact`` builds them from the compact location index (same values).
+    """
+    return _load_metric_matrix(*file_signature(csv_path), compact)
+
+
+def comparison_frame(matrix, metric, locations, population=None, align=False, threshold=100):
+    """Return ``metric`` for ``locations`` as plotted by the comparison charts.
+
+    With ``population`` the values are per million people; with ``align`` the
+    rows are days since the ``threshold``-th case instead of dates.
+    """
+    if population is not None:
+        frame = matrix.per_capita(metric, locations, population)
+    else:
+        frame = matrix.frame(metric, locations)
+    return matrix.since_threshold(frame, threshold) if align else frame
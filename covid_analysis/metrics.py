@@ -0,0 +1,156 @@
+"""Derived daily metrics for every location at once.
+
+From the cumulative totals of the cleaned frame (sorted by ``(Location,
+Date)``) this computes, with array operations over all locations rather
+than a loop per country:
+
+- ``New Cases`` / ``New Deaths``: change of the totals since the previous day;
+- ``New Cases 7d`` / ``14d`` and ``New Deaths 7d`` / ``14d``: mean daily change
+  over the last 7 / 14 days;
+- ``CFR %``: case fatality rate on each day;
+- ``Growth Rate %``: average daily growth of total cases over the last 7 days;
+- ``Doubling Time``: days for total cases to double at that growth rate.
+
+Lags and windows are calendar days, not rows: cleaning drops days without
+totals, so the row ``n`` days earlier is looked up by date within the same
+location. Where it is missing (the first days of a location, or around a
+gap in reporting) the value is NaN rather than a change spread over an
+unknown number of days. The result is cached as ``*.metrics.feather`` next
+to the cleaned store, tagged with :data:`METRICS_VERSION`, and is updated per
+location by :mod:`covid_analysis.incremental`.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.compact import compact_metrics, frame_bytes
+from covid_analysis.index import SORT_COLUMNS, LocationIndex, is_sorted
+from covid_analysis.loader import DATA_PATH, file_signature
+from covid_analysis.store import (is_current, read_cleaned, read_store, read_store_metadata,
+                                  sibling_path, source_metadata, store_path_for, write_store)
+
+WINDOWS = [7, 14]
+GROWTH_WINDOW = 7
+# Bump when the definitions change so that cached metrics files are rebuilt.
+METRICS_VERSION = "2"
+VERSION_KEY = b"metrics_version"
+
+
+def metrics_path_for(store_path):
+    """Return the metrics file kept next to ``store_path``."""
+    return sibling_path(store_path, ".metrics.feather")
+
+
+def _group_starts(locations):
+    """Return, for every row, the position of the first row of its location."""
+    locations = np.asarray(locations)
+    boundary = np.ones(len(locations), dtype=bool)
+    boundary[1:] = locations[1:] != locations[:-1]
+    return np.maximum.accumulate(np.where(boundary, np.arange(len(locations)), 0))
+
+
+def _day_keys(locations, dates, max_lag):
+    """Return increasing int64 keys of ``(location, day)`` for a sorted frame.
+
+    Days are offset by ``max_lag`` within a span per location, so a key minus
+    up to ``max_lag`` days never reaches the keys of the previous location.
+    """
+    days = np.asarray(dates).astype("datetime64[D]").astype("int64")
+    if len(days) == 0:
+        return days
+    span = int(days.max() - days.min()) + max_lag + 1
+    return _group_starts(locations).astype("int64") * span + (days - days.min() + max_lag)
+
+
+def _lag_days(values, days, keys):
+    """Return ``values`` from ``days`` calendar days earlier in the same location, else NaN."""
+    if len(keys) == 0:
+        return np.asarray(values, dtype="float64")
+    target = keys - days
+    positions = np.minimum(np.searchsorted(keys, target), len(keys) - 1)
+    return np.where(keys[positions] == target, values[positions], np.nan)
+
+
+def derive_metrics(df):
+    """Return the derived metrics of a cleaned frame, sorted by location and date."""
+    if not is_sorted(df):
+        df = df.sort_values(SORT_COLUMNS, ignore_index=True)
+    keys = _day_keys(df["Location"].to_numpy(), df["Date"].to_numpy(),
+                     max(WINDOWS + [GROWTH_WINDOW, 1]))
+    metrics = {"Location": df["Location"].to_numpy(), "Date": df["Date"].to_numpy()}
+
+    cases = df["Total Cases"].to_numpy(dtype="float64")
+    deaths = df["Total Deaths"].to_numpy(dtype="float64")
+    for name, totals in [("Cases", cases), ("Deaths", deaths)]:
+        metrics[f"New {name}"] = totals - _lag_days(totals, 1, keys)
+        for window in WINDOWS:
+            metrics[f"New {name} {window}d"] = (totals - _lag_days(totals, window, keys)) / window
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics["CFR %"] = np.where(cases > 0, deaths / cases * 100, np.nan)
+        previous = _lag_days(cases, GROWTH_WINDOW, keys)
+        growth = np.where(previous > 0, (cases / previous) ** (1 / GROWTH_WINDOW) - 1, np.nan)
+        metrics["Growth Rate %"] = growth * 100
+        metrics["Doubling Time"] = np.where(growth > 0, np.log(2) / np.log1p(growth), np.nan)
+    return pd.DataFrame(metrics)
+
+
+def update_metrics(metrics, cleaned, locations):
+    """Replace the metrics of ``locations`` with those derived from ``cleaned``.
+
+    ``cleaned`` needs to contain (at least) all rows of those locations.
+    """
+    locations = list(locations)
+    kept = metrics[~metrics["Location"].isin(locations)]
+    fresh = derive_metrics(cleaned[cleaned["Location"].isin(locations)])
+    return pd.concat([kept, fresh], ignore_index=True) \
+             .sort_values(SORT_COLUMNS, ignore_index=True)
+
+
+def metrics_metadata(csv_path, sha256=None):
+    """Return the store metadata of a metrics file derived from ``csv_path``."""
+    return {**source_metadata(csv_path, sha256), VERSION_KEY: METRICS_VERSION.encode()}
+
+
+def has_current_version(metrics_path):
+    """Return whether the metrics file was derived with the current definitions."""
+    metadata = read_store_metadata(metrics_path)
+    return bool(metadata) and metadata.get(VERSION_KEY) == METRICS_VERSION.encode()
+
+
+@lru_cache(maxsize=1)
+def _load_metrics(csv_path, mtime_ns, size, metrics_path, compact):
+    if not (has_current_version(metrics_path) and is_current(csv_path, metrics_path)):
+        write_store(derive_metrics(read_cleaned(csv_path)), metrics_path,
+                    metrics_metadata(csv_path))
+    metrics = read_store(metrics_path)
+    full_bytes = frame_bytes(metrics)
+    if compact:
+        metrics = compact_metrics(metrics)
+    return LocationIndex(metrics), full_bytes
+
+
+def _metrics_key(csv_path, store_path, compact):
+    csv_path, mtime_ns, size = file_signature(csv_path)
+    store_path = os.path.abspath(store_path or store_path_for(csv_path))
+    return csv_path, mtime_ns, size, metrics_path_for(store_path), compact
+
+
+def load_metrics(csv_path=DATA_PATH, store_path=None, compact=False):
+    """Return a :class:`~covid_analysis.index.LocationIndex` over the derived metrics.
+
+    The metrics file is reused when it matches ``csv_path`` and rebuilt
+    otherwise; the result is memoized on the CSV version. Use
+    ``load_metrics().series(location)`` for one country's derived series.
+    With ``compact`` the frame is :func:`~covid_analysis.compact.compact_metrics`.
+    """
+    return _load_metrics(*_metrics_key(csv_path, store_path, compact))[0]
+
+
+def metrics_memory(csv_path=DATA_PATH, store_path=None, compact=False):
+    """Return the ``(full, loaded)`` memory usage in bytes of :func:`load_metrics`."""
+    index, full_bytes = _load_metrics(*_metrics_key(csv_path, store_path, compact))
+    return full_bytes, frame_bytes(index.df)
@@ -0,0 +1,91 @@
+"""Range queries over the cleaned dataset.
+
+Within each location of a :class:`~covid_analysis.index.LocationIndex` the
+rows are date-ordered, so a date range is found with two binary searches
+(``searchsorted``) in that location's slice. A query for some locations,
+a date range and some columns therefore costs O(log n) per location plus
+the size of the result, without scanning or masking the whole frame::
+
+    from covid_analysis.index import load_location_index
+    from covid_analysis.query import query
+
+    query(load_location_index(), ["Poland", "Italy"], "2020-03-01", "2020-09-30",
+          ["Total Cases", "Total Deaths"])
+
+OWID also publishes aggregate rows (``World``, continents, income groups,
+...) alongside countries; :data:`AGGREGATE_LOCATIONS` lists them so they can
+be left out of country rankings and comparisons.
+"""
+
+import numpy as np
+import pandas as pd
+
+from covid_analysis.index import SORT_COLUMNS
+
+AGGREGATE_LOCATIONS = frozenset([
+    "World", "International",
+    "Africa", "Asia", "Europe", "North America", "Oceania", "South America",
+    "European Union", "European Union (27)",
+    "High income", "Upper middle income", "Lower middle income", "Low income",
+    "High-income countries", "Upper-middle-income countries",
+    "Lower-middle-income countries", "Low-income countries",
+    "World excl. China", "World excl. China and South Korea",
+    "World excl. China, South Korea, Japan and Singapore",
+    "Asia excl. China", "Summer Olympics 2020", "Winter Olympics 2022",
+])
+
+
+def is_aggregate(location):
+    """Return whether ``location`` is an OWID aggregate rather than a country."""
+    return location in AGGREGATE_LOCATIONS
+
+
+def countries(locations):
+    """Return ``locations`` without the aggregates, in the same order."""
+    return [location for location in locations if not is_aggregate(location)]
+
+
+def drop_aggregates(frame):
+    """Return the rows of a frame indexed by location that are countries."""
+    return frame[~frame.index.isin(AGGREGATE_LOCATIONS)]
+
+
+def _timestamp(value):
+    return None if value is None else pd.Timestamp(value).to_datetime64()
+
+
+def date_bounds(index, location, start=None, end=None):
+    """Return the ``(start, stop)`` row offsets of ``location`` from ``start`` to ``end``.
+
+    Both ends are inclusive; ``None`` leaves that side open.
+    """
+    first, stop = index.bounds(location)
+    if start is None and end is None:
+        return first, stop
+    dates = index.df["Date"].to_numpy()[first:stop]
+    low = 0 if start is None else np.searchsorted(dates, _timestamp(start), side="left")
+    high = len(dates) if end is None else np.searchsorted(dates, _timestamp(end), side="right")
+    return first + int(low), first + max(int(low), int(high))
+
+
+def query(index, locations=None, start=None, end=None, columns=None, aggregates=True):
+    """Return the rows of ``locations`` from ``start`` to ``end`` (inclusive).
+
+    ``locations`` defaults to all locations of ``index``, in the order given;
+    ``columns`` (e.g. metrics) are returned after ``Location`` and ``Date``.
+    With ``aggregates=False``, :data:`AGGREGATE_LOCATIONS` are left out.
+    Unknown locations raise ``KeyError``.
+    """
+    locations = index.locations if locations is None else list(locations)
+    if not aggregates:
+        locations = countries(locations)
+    df = index.df
+    if columns is not None:
+        df = df[SORT_COLUMNS + [column for column in columns if column not in SORT_COLUMNS]]
+    # Concatenate positional slices rather than taking row positions: a take
+    # on Arrow-backed string columns costs time in the length of the column.
+    slices = [df.iloc[first:stop] for first, stop in
+              (date_bounds(index, location, start, end) for location in locations)]
+    if not slices:
+        return df.iloc[0:0]
+    return slices[0] if len(slices) == 1 else pd.concat(slices)
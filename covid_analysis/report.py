@@ -0,0 +1,173 @@
+"""Headless batch report generator.
+
+Renders the dashboard analysis without Streamlit: the CFR table, the top-N
+bars and the socio-economic scatters once, plus the cases/deaths chart, the
+daily series and a JSON summary for every location (or a chosen list).
+Locations are processed in a process pool, and outputs whose inputs have not
+changed since the last run (tracked in ``manifest.json``) are skipped::
+
+    python -m covid_analysis.report --output reports --workers 8
+    python -m covid_analysis.report --locations Poland Italy
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from covid_analysis.aggregates import load_country_summary, top_locations
+from covid_analysis.figures import bar_chart, country_chart, scatter_chart, to_png
+from covid_analysis.index import load_location_index
+from covid_analysis.loader import DATA_PATH
+from covid_analysis.query import drop_aggregates
+
+# Bump when the rendering changes so that existing outputs are regenerated.
+REPORT_VERSION = "3"
+GLOBAL_KEY = "__global__"
+
+_csv_path = None
+
+
+def slugify(location):
+    return re.sub(r"[^a-z0-9]+", "-", location.lower()).strip("-")
+
+
+def fingerprint(df):
+    """Return a digest of the contents of ``df`` and :data:`REPORT_VERSION`."""
+    digest = hashlib.sha256(REPORT_VERSION.encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(",".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+def _write_png(fig, path):
+    with open(path, "wb") as handle:
+        handle.write(to_png(fig))
+
+
+def _write_json(data, path):
+    with open(path, "w") as handle:
+        json.dump(data, handle, indent=2, default=str)
+
+
+def write_global_report(summary, output_dir):
+    """Write the cross-country tables and charts of the analysis to ``output_dir``."""
+    countries = drop_aggregates(summary)
+    df_top10_cfr = countries[["CFR %"]].sort_values("CFR %", ascending=False).head(10)
+    summary.to_csv(os.path.join(output_dir, "country_summary.csv"))
+    df_top10_cfr.to_csv(os.path.join(output_dir, "top10_cfr.csv"))
+
+    charts = {
+        "top5_cases.png": bar_chart(top_locations(summary, "Max Total Cases"), "darkorange",
+                                    "Total Cases", "Top 5 Countries by Total COVID-19 Cases"),
+        "top5_deaths.png": bar_chart(top_locations(summary, "Max Total Deaths"), "darkcyan",
+                                     "Total Deaths", "Top 5 Countries by Total COVID-19 Deaths"),
+        "top10_cfr.png": bar_chart(df_top10_cfr, "purple", "CFR (%)",
+                                   "Top 10 Countries by COVID-19 CFR", figsize=(10, 6)),
+        "gdp_vs_cases.png": scatter_chart(countries, "Gdp Per Capita", "Total Cases", "green",
+                                          "GDP per Capita", "Total Cases",
+                                          "GDP per Capita vs Total COVID-19 Cases"),
+        "hdi_vs_deaths.png": scatter_chart(countries, "Human Development Index", "Total Deaths",
+                                           "purple", "Human Development Index", "Total Deaths",
+                                           "HDI vs Total COVID-19 Deaths"),
+    }
+    for name, fig in charts.items():
+        _write_png(fig, os.path.join(output_dir, name))
+
+    _write_json({"locations": len(summary),
+                 "global_average_cfr": round(countries["CFR %"].mean(), 2),
+                 "top10_cfr": df_top10_cfr["CFR %"].to_dict()},
+                os.path.join(output_dir, "summary.json"))
+
+
+def write_location_report(df_country, location, record, output_dir):
+    """Write the chart, daily series and summary of one location to ``output_dir``."""
+    os.makedirs(output_dir, exist_ok=True)
+    _write_png(country_chart(df_country, location), os.path.join(output_dir, "cases_deaths.png"))
+    df_country.to_csv(os.path.join(output_dir, "series.csv"), index=False)
+    _write_json({"location": location, **record}, os.path.join(output_dir, "summary.json"))
+
+
+def _init_worker(csv_path):
+    global _csv_path
+    _csv_path = csv_path
+
+
+def _location_task(args):
+    location, record, previous, output_dir = args
+    df_country = load_location_index(_csv_path).series(location)
+    digest = fingerprint(df_country)
+    target = os.path.join(output_dir, "locations", slugify(location))
+    if digest == previous and os.path.isdir(target):
+        return location, digest, False
+    write_location_report(df_country, location, record, target)
+    return location, digest, True
+
+
+def read_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, "manifest.json")) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def generate_reports(csv_path=DATA_PATH, output_dir="reports", locations=None,
+                     workers=None, force=False):
+    """Render the analysis for ``locations`` (default: all) and return a summary dict."""
+    csv_path = os.path.abspath(csv_path)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = read_manifest(output_dir)
+    index = load_location_index(csv_path)
+    summary = load_country_summary(csv_path)
+
+    locations = list(locations) if locations else index.locations
+    unknown = [location for location in locations if location not in index]
+    if unknown:
+        raise KeyError(f"Unknown locations: {unknown}")
+
+    rendered = []
+    digest = fingerprint(summary.reset_index())
+    if force or manifest.get(GLOBAL_KEY) != digest:
+        write_global_report(summary, output_dir)
+        rendered.append(GLOBAL_KEY)
+    manifest[GLOBAL_KEY] = digest
+
+    records = json.loads(summary.to_json(orient="index", date_format="iso"))
+    tasks = [(location, records[location], None if force else manifest.get(location), output_dir)
+             for location in locations]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(csv_path,)) as executor:
+        for location, digest, was_rendered in executor.map(_location_task, tasks,
+                                                           chunksize=chunksize):
+            manifest[location] = digest
+            if was_rendered:
+                rendered.append(location)
+
+    _write_json(manifest, os.path.join(output_dir, "manifest.json"))
+    return {"rendered": rendered, "skipped": len(tasks) + 1 - len(rendered)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the COVID-19 analysis to files.")
+    parser.add_argument("--data", default=DATA_PATH, help="OWID CSV (default: %(default)s)")
+    parser.add_argument("-o", "--output", default="reports",
+                        help="output directory (default: %(default)s)")
+    parser.add_argument("-l", "--locations", nargs="+", help="locations to render (default: all)")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="re-render outputs even if their inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    result = generate_reports(args.data, args.output, args.locations, args.workers, args.force)
+    print(f"Rendered {len(result['rendered'])} outputs, skipped {result['skipped']} unchanged")
+
+
+if __name__ == "__main__":
+    main()
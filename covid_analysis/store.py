@@ -0,0 +1,194 @@
+"""Columnar on-disk cache of the cleaned dataset.
+
+The cleaned frame is written to an uncompressed Feather (Arrow IPC) file
+together with the SHA-256 of the source CSV. On later starts the file is
+memory-mapped instead of re-parsing and re-cleaning the CSV, as long as the
+recorded hash still matches the CSV.
+
+Build the store ahead of time with::
+
+    python -m covid_analysis.store owid-covid-data.csv
+"""
+
+import argparse
+import hashlib
+import os
+import uuid
+from functools import lru_cache
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from covid_analysis.loader import DATA_PATH, clean_covid_data, file_signature, read_owid_csv
+
+HASH_KEY = b"source_sha256"
+SIZE_KEY = b"source_size"
+MTIME_KEY = b"source_mtime_ns"
+
+
+def store_path_for(csv_path):
+    """Return the default store location next to ``csv_path``."""
+    return os.path.splitext(csv_path)[0] + ".clean.feather"
+
+
+def sibling_path(store_path, suffix):
+    """Return the file ending in ``suffix`` (e.g. ``.metrics.feather``) kept next to a store."""
+    base = store_path[:-len(".clean.feather")] if store_path.endswith(".clean.feather") \
+        else os.path.splitext(store_path)[0]
+    return base + suffix
+
+
+def raw_path_for(store_path):
+    """Return the file of pruned raw columns kept next to ``store_path``."""
+    return sibling_path(store_path, ".raw.feather")
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_store_metadata(store_path):
+    """Return the schema metadata of a store, or ``None`` if it is unreadable."""
+    try:
+        with pa.memory_map(store_path) as source:
+            return pa.ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def temp_path_for(path):
+    """Return a unique temporary path next to ``path`` to write to before renaming.
+
+    The name is unique per call, so concurrent writers of the same file never
+    share (and truncate) a temporary file; the last ``os.replace`` wins.
+    """
+    return f"{path}.{os.getpid()}.{uuid.uuid4().hex[:12]}.tmp"
+
+
+def write_store(df, store_path, metadata):
+    """Write ``df`` uncompressed to ``store_path`` with ``metadata`` attached.
+
+    The file is written under a unique temporary name and moved into place,
+    so readers only ever see a complete store.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    tmp_path = temp_path_for(store_path)
+    try:
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, store_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_store(store_path):
+    """Memory-map a store and return it as a DataFrame."""
+    table = feather.read_table(store_path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def source_metadata(csv_path, sha256=None):
+    _, mtime_ns, size = file_signature(csv_path)
+    return {
+        HASH_KEY: (sha256 or file_sha256(csv_path)).encode(),
+        SIZE_KEY: str(size).encode(),
+        MTIME_KEY: str(mtime_ns).encode(),
+    }
+
+
+def is_current(csv_path, store_path):
+    """Return whether the store at ``store_path`` was built from ``csv_path``.
+
+    A matching size and mtime is accepted without hashing; otherwise the CSV
+    is hashed and compared with the recorded digest, so a copied but
+    unchanged file still hits the store.
+    """
+    metadata = read_store_metadata(store_path)
+    if not metadata or HASH_KEY not in metadata:
+        return False
+    _, mtime_ns, size = file_signature(csv_path)
+    if metadata.get(SIZE_KEY) == str(size).encode() and \
+            metadata.get(MTIME_KEY) == str(mtime_ns).encode():
+        return True
+    return metadata[HASH_KEY] == file_sha256(csv_path).encode()
+
+
+def build_store(csv_path=DATA_PATH, store_path=None):
+    """Clean ``csv_path`` and write it to the store, sorted by location and date.
+
+    The pruned raw columns are written alongside from the same parse of the
+    CSV (see :func:`read_raw`). Returns the cleaned frame.
+    """
+    store_path = store_path or store_path_for(csv_path)
+    raw = read_owid_csv(csv_path)
+    metadata = source_metadata(csv_path)
+    write_store(raw, raw_path_for(store_path), metadata)
+    df = clean_covid_data(raw).sort_values(["Location", "Date"], ignore_index=True)
+    write_store(df, store_path, metadata)
+    return df
+
+
+def read_cleaned(csv_path=DATA_PATH, store_path=None):
+    """Read the cleaned frame from the store, (re)building it when missing or stale.
+
+    Unlike :func:`load_cleaned` the result is not memoized.
+    """
+    store_path = store_path or store_path_for(csv_path)
+    if not is_current(csv_path, store_path):
+        build_store(csv_path, store_path)
+    return read_store(store_path)
+
+
+def read_raw(csv_path=DATA_PATH, store_path=None):
+    """Read the pruned raw columns of ``csv_path`` in file order from the store.
+
+    The store is (re)built when it is missing or stale. The result is memory-mapped
+    and not memoized, so it is not kept in memory once the caller drops it.
+    """
+    store_path = store_path or store_path_for(csv_path)
+    raw_path = raw_path_for(store_path)
+    if not is_current(csv_path, raw_path):
+        build_store(csv_path, store_path)
+    return read_store(raw_path)
+
+
+@lru_cache(maxsize=1)
+def _load_cleaned(csv_path, mtime_ns, size, store_path):
+    return read_cleaned(csv_path, store_path)
+
+
+def load_cleaned(csv_path=DATA_PATH, store_path=None):
+    """Return the cleaned frame, from the store when it matches ``csv_path``.
+
+    The store is (re)built when it is missing or stale. The result is
+    memoized on the CSV's file version and must not be modified.
+    """
+    csv_path, mtime_ns, size = file_signature(csv_path)
+    return _load_cleaned(csv_path, mtime_ns, size,
+                         os.path.abspath(store_path or store_path_for(csv_path)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the cleaned columnar store.")
+    parser.add_argument("csv", nargs="?", default=DATA_PATH, help="OWID CSV to clean")
+    parser.add_argument("-o", "--output", help="store path (default: next to the CSV)")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="rebuild even if the store is current")
+    args = parser.parse_args(argv)
+
+    store_path = args.output or store_path_for(args.csv)
+    if not args.force and is_current(args.csv, store_path):
+        print(f"{store_path} is up to date")
+        return
+    df = build_store(args.csv, store_path)
+    print(f"Wrote {len(df)} rows to {store_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Chunked cleaning pipeline for CSVs larger than memory.
+
+The cleaning steps of :func:`covid_analysis.loader.clean_covid_data` are
+applied chunk by chunk in two passes:
+
+1. read each chunk with column selection, dtypes and date parsing, drop rows
+   without totals, and accumulate value counts of GDP per capita and HDI;
+2. read the chunks again, impute with the global modes from pass 1, rename
+   the columns and append the chunk to a Feather or Parquet file.
+
+Peak memory is bounded by the chunk size (plus the value counts), not the
+file size. The output has the same rows as the in-memory pipeline, sorted by
+``(Location, Date)``: OWID files already are, and other files are sorted
+afterwards from a memory-mapped intermediate file, holding only the location
+and date columns in memory.
+
+The output carries the source metadata of :mod:`covid_analysis.store`, so
+written to the default store path (with the raw columns next to it, as
+:func:`~covid_analysis.store.build_store` does) the app uses it as is
+instead of cleaning the CSV in memory::
+
+    python -m covid_analysis.streaming big-extract.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from covid_analysis.loader import (IMPUTED_COLUMNS, RAW_COLUMNS, RAW_DTYPES,
+                                   drop_missing_totals, impute_and_rename)
+from covid_analysis.store import raw_path_for, source_metadata, store_path_for, temp_path_for
+
+CHUNK_SIZE = 200_000
+
+
+def _raw_chunks(csv_path, chunk_size):
+    with pd.read_csv(csv_path, usecols=RAW_COLUMNS, dtype=RAW_DTYPES, parse_dates=["date"],
+                     chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk[RAW_COLUMNS]
+
+
+def read_chunks(csv_path, chunk_size=CHUNK_SIZE):
+    """Yield cleaned-for-totals chunks of the analysis columns of ``csv_path``."""
+    for chunk in _raw_chunks(csv_path, chunk_size):
+        yield drop_missing_totals(chunk)
+
+
+def _first_pass(csv_path, chunk_size, raw_writer=None):
+    """Return the imputation modes and whether the rows are in ``(location, date)`` order.
+
+    The raw chunks are appended to ``raw_writer`` on the way, if given.
+    """
+    counts = {column: pd.Series(dtype="int64") for column in IMPUTED_COLUMNS}
+    ordered, last = True, None
+    for raw in _raw_chunks(csv_path, chunk_size):
+        if raw_writer is not None and len(raw):
+            raw_writer.write(raw)
+        chunk = drop_missing_totals(raw)
+        if not len(chunk):
+            continue
+        for column in IMPUTED_COLUMNS:
+            counts[column] = counts[column].add(chunk[column].value_counts(), fill_value=0)
+        keys = pd.MultiIndex.from_frame(chunk[["location", "date"]])
+        ordered = ordered and keys.is_monotonic_increasing and (last is None or last <= keys[0])
+        last = keys[-1]
+    modes = {column: values[values == values.max()].index.min()
+             for column, values in counts.items()}
+    return modes, ordered
+
+
+def streaming_modes(csv_path, chunk_size=CHUNK_SIZE):
+    """First pass: return the mode of GDP per capita and HDI over the whole file.
+
+    Ties are broken towards the smallest value, as ``Series.mode()[0]`` does.
+    """
+    return _first_pass(csv_path, chunk_size)[0]
+
+
+class _ChunkWriter:
+    """Appends DataFrame chunks to a Feather (Arrow IPC) or Parquet file."""
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.tmp_path = temp_path_for(path)
+        self.parquet = path.endswith(".parquet")
+        self.metadata = metadata or {}
+        self._sink = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def write_table(self, table):
+        if self._writer is None:
+            self._schema = table.schema.with_metadata({**(table.schema.metadata or {}),
+                                                       **self.metadata})
+            table = table.replace_schema_metadata(self._schema.metadata)
+            if self.parquet:
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            else:
+                self._sink = pa.OSFile(self.tmp_path, "wb")
+                self._writer = pa.ipc.new_file(self._sink, self._schema)
+        else:
+            table = table.cast(self._schema)
+        self._writer.write_table(table)
+
+    def close(self, commit=True):
+        """Finish the file and move it into place; returns whether anything was written."""
+        if self._writer is None:
+            return False
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._writer = self._sink = None
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+        return commit
+
+
+def _write_sorted(path, writer, chunk_size):
+    """Append the rows of the Feather file ``path`` to ``writer`` sorted by location and date.
+
+    Only the two key columns are loaded; the rows are copied in chunks from
+    the memory-mapped file.
+    """
+    table = feather.read_table(path, memory_map=True)
+    codes, _ = pd.factorize(table.column("Location").to_pandas(), sort=True)
+    order = np.lexsort((table.column("Date").to_numpy(), codes))
+    for start in range(0, len(order), chunk_size):
+        writer.write_table(table.take(order[start:start + chunk_size]))
+
+
+def stream_clean(csv_path, output_path=None, chunk_size=CHUNK_SIZE):
+    """Clean ``csv_path`` in chunks into ``output_path`` and return the row count.
+
+    ``output_path`` defaults to :func:`~covid_analysis.store.store_path_for`
+    the CSV. The output format follows the extension: ``.parquet`` for
+    Parquet, anything else for an uncompressed Feather store, which
+    :func:`covid_analysis.store.read_store` can memory-map and which gets the
+    raw columns written next to it (:func:`~covid_analysis.store.raw_path_for`).
+    """
+    output_path = output_path or store_path_for(csv_path)
+    metadata = source_metadata(csv_path)
+    raw_writer = None if output_path.endswith(".parquet") \
+        else _ChunkWriter(raw_path_for(output_path), metadata)
+    writer = _ChunkWriter(output_path, metadata)
+    unsorted = None
+    rows = 0
+    try:
+        modes, ordered = _first_pass(csv_path, chunk_size, raw_writer)
+        if not ordered:
+            unsorted = _ChunkWriter(temp_path_for(output_path) + ".feather")
+        for chunk in read_chunks(csv_path, chunk_size):
+            if len(chunk):
+                (unsorted or writer).write(impute_and_rename(chunk, modes))
+                rows += len(chunk)
+        if unsorted is not None and unsorted.close():
+            _write_sorted(unsorted.path, writer, chunk_size)
+    except BaseException:
+        for partial in (raw_writer, writer, unsorted):
+            if partial is not None:
+                partial.close(commit=False)
+        raise
+    finally:
+        if unsorted is not None and os.path.exists(unsorted.path):
+            os.remove(unsorted.path)
+    if raw_writer is not None:
+        raw_writer.close()
+    if not writer.close():
+        raise ValueError(f"{csv_path} has no rows with total cases and deaths")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean a large OWID-style CSV in chunks.")
+    parser.add_argument("csv", help="input CSV")
+    parser.add_argument("output", nargs="?",
+                        help="output .feather or .parquet file (default: the store next to "
+                             "the CSV)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"rows per chunk (default: {CHUNK_SIZE})")
+    args = parser.parse_args(argv)
+
+    rows = stream_clean(args.csv, args.output, args.chunk_size)
+    print(f"Wrote {rows} rows to {args.output or store_path_for(args.csv)}")
+
+
+if __name__ == "__main__":
+    main()
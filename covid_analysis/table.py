@@ -0,0 +1,100 @@
+"""Server-side paginated table view.
+
+Filtering by location and date range and sorting happen on the server; only
+the visible page of rows is sent to the browser, so the payload does not
+grow with the dataset.
+"""
+
+import math
+
+import pandas as pd
+import streamlit as st
+
+from covid_analysis.query import query
+
+
+def filter_rows(df, locations=None, start=None, end=None, index=None,
+                location="Location", date="Date"):
+    """Return the rows of ``df`` for ``locations`` between ``start`` and ``end``.
+
+    With a :class:`~covid_analysis.index.LocationIndex`, the rows are fetched
+    with :func:`covid_analysis.query.query` (binary search within each
+    location's slice) instead of scanning the frame. ``location`` and
+    ``date`` name the columns to filter on when there is no index.
+    """
+    if index is not None:
+        if not locations and start is None and end is None:
+            return index.df
+        return query(index, locations or None, start, end)
+    if locations:
+        df = df[df[location].isin(locations)]
+    if start is not None:
+        df = df[df[date] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df[date] <= pd.Timestamp(end)]
+    return df
+
+
+def page_rows(df, page, page_size, sort_by=None, ascending=True):
+    """Return rows ``page * page_size`` to ``(page + 1) * page_size`` of ``df``.
+
+    Numeric and date columns are ordered with a partial selection of just the
+    rows up to the requested page rather than a full sort.
+    """
+    start, stop = page * page_size, (page + 1) * page_size
+    if sort_by is None:
+        return (df if ascending else df.iloc[::-1]).iloc[start:stop]
+    column = df[sort_by]
+    if stop < len(df) and (pd.api.types.is_numeric_dtype(column)
+                           or pd.api.types.is_datetime64_any_dtype(column)):
+        select = df.nsmallest if ascending else df.nlargest
+        return select(stop, sort_by).iloc[start:stop]
+    return df.sort_values(sort_by, ascending=ascending, kind="stable").iloc[start:stop]
+
+
+def page_count(n_rows, page_size):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def paginated_table(df, key, index=None, page_size=50, expand=None,
+                    location="Location", date="Date"):
+    """Render ``df`` as a filterable, sortable table that ships one page at a time.
+
+    ``expand``, if given, is applied to the visible page only before it is
+    shown, e.g. :meth:`~covid_analysis.compact.CompactData.with_indicators`.
+    ``location`` and ``date`` name the filter columns of a frame without an
+    index, such as the raw CSV with its original column names.
+    """
+    locations = index.locations if index is not None else sorted(df[location].unique())
+    dates = df[date]
+    first_date, last_date = dates.min().date(), dates.max().date()
+
+    filter_col, date_col = st.columns(2)
+    selected = filter_col.multiselect("Locations", locations, key=f"{key}_locations")
+    date_range = date_col.date_input("Date range", (first_date, last_date),
+                                     min_value=first_date, max_value=last_date,
+                                     key=f"{key}_dates")
+    start, end = (date_range + (None, None))[:2] if isinstance(date_range, tuple) \
+        else (date_range, None)
+    # The default full range is no filter, so the frame is shown without a copy.
+    if start is not None and start <= first_date:
+        start = None
+    if end is not None and end >= last_date:
+        end = None
+
+    sort_col, order_col, page_col = st.columns(3)
+    sort_by = sort_col.selectbox("Sort by", [None, *df.columns], key=f"{key}_sort",
+                                 format_func=lambda column: column if column is not None
+                                 else "Location, Date" if index is not None else "File order")
+    ascending = order_col.radio("Order", ["Ascending", "Descending"], horizontal=True,
+                                key=f"{key}_order") == "Ascending"
+
+    rows = filter_rows(df, selected, start, end, index, location, date)
+    pages = page_count(len(rows), page_size)
+    page = page_col.number_input("Page", min_value=1, max_value=pages, value=1,
+                                 key=f"{key}_page_{pages}") - 1
+
+    visible = page_rows(rows, page, page_size, sort_by, ascending)
+    st.dataframe(expand(visible) if expand is not None else visible)
+    first = page * page_size + 1 if len(rows) else 0
+    st.caption(f"Rows {first:,}–{min((page + 1) * page_size, len(rows)):,} of {len(rows):,}")
@@ -0,0 +1,95 @@
+"""Incremental ingestion must leave the same files as a full rebuild."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from covid_analysis import incremental
+from covid_analysis.aggregates import country_summary, latest_path_for, load_country_summary
+from covid_analysis.metrics import derive_metrics, metrics_path_for
+from covid_analysis.store import build_store, read_store, store_path_for
+
+
+def owid_frame(locations, days, seed):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for number, location in enumerate(locations):
+        gdp = [np.nan, 1000.0, 2000.0][number % 3]
+        hdi = [0.5, np.nan, 0.7][number % 3]
+        cases = deaths = 0.0
+        for date in pd.date_range("2020-03-01", periods=days):
+            cases += rng.integers(0, 50)
+            deaths += rng.integers(0, 3)
+            rows.append({"location": location, "date": date, "total_cases": cases,
+                         "total_deaths": deaths, "gdp_per_capita": gdp,
+                         "human_development_index": hdi, "population": 1e6})
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def versions():
+    v1 = owid_frame(["Poland", "Italy", "World", "Chile"], 30, seed=1)
+    v2 = pd.concat([v1, owid_frame(["Peru", "Kenya", "Nepal"], 20, seed=2)], ignore_index=True)
+    v2 = v2.drop(index=v2.index[(v2["location"] == "World") & (v2["date"] > "2020-03-25")])
+    v2.loc[v2["location"] == "Italy", "total_cases"] += 5
+    # Missing totals on one day make a gap, so calendar-day lags are exercised.
+    v2.loc[(v2["location"] == "Poland") & (v2["date"] == "2020-03-10"), "total_cases"] = np.nan
+    # New rows with GDP 2000 move its imputation mode from 1000.
+    v2.loc[v2["location"].isin(["Kenya", "Nepal"]), "gdp_per_capita"] = 2000.0
+    return v1, v2
+
+
+def write_csv(df, path, mtime):
+    df.to_csv(path, index=False)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def assert_matches_full_build(csv_path, tmp_path):
+    store_path = store_path_for(str(csv_path))
+    full_path = str(tmp_path / "full.clean.feather")
+    build_store(str(csv_path), full_path)
+    expected = read_store(full_path)
+    pd.testing.assert_frame_equal(read_store(store_path), expected)
+    pd.testing.assert_frame_equal(read_store(latest_path_for(store_path)).set_index("Location"),
+                                  country_summary(expected))
+    pd.testing.assert_frame_equal(read_store(metrics_path_for(store_path)),
+                                  derive_metrics(expected))
+    pd.testing.assert_frame_equal(load_country_summary(str(csv_path)), country_summary(expected))
+
+
+def test_ingest_matches_full_build(versions, tmp_path):
+    v1, v2 = versions
+    csv_path = tmp_path / "owid.csv"
+    write_csv(v1, csv_path, 1_000_000_000)
+    incremental.ingest(str(csv_path))
+    assert_matches_full_build(csv_path, tmp_path)
+
+    write_csv(v2, csv_path, 2_000_000_000)
+    summary = incremental.ingest(str(csv_path))
+    assert summary["added"] and summary["changed"] and summary["removed"]
+    assert_matches_full_build(csv_path, tmp_path)
+
+
+def test_interrupted_ingest_is_redone(versions, tmp_path, monkeypatch):
+    v1, v2 = versions
+    csv_path = tmp_path / "owid.csv"
+    write_csv(v1, csv_path, 1_000_000_000)
+    incremental.ingest(str(csv_path))
+
+    write_csv(v2, csv_path, 2_000_000_000)
+    write_store = incremental.write_store
+
+    def crash_on_store(df, path, metadata):
+        if path == store_path_for(str(csv_path)):
+            raise KeyboardInterrupt
+        write_store(df, path, metadata)
+
+    monkeypatch.setattr(incremental, "write_store", crash_on_store)
+    with pytest.raises(KeyboardInterrupt):
+        incremental.ingest(str(csv_path))
+    monkeypatch.undo()
+
+    incremental.ingest(str(csv_path))
+    assert_matches_full_build(csv_path, tmp_path)
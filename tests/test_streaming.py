@@ -0,0 +1,46 @@
+"""Streaming cleaning must write the same store as the in-memory pipeline."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from covid_analysis.store import (build_store, is_current, raw_path_for, read_store,
+                                  store_path_for)
+from covid_analysis.streaming import stream_clean
+
+
+def owid_frame(n_locations=5, days=40, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2020-03-01", periods=days)
+    df = pd.DataFrame({
+        "location": np.repeat([f"Country {i}" for i in range(n_locations)], days),
+        "date": np.tile(dates, n_locations),
+        "total_cases": rng.integers(0, 1000, n_locations * days).cumsum().astype("float64"),
+        "total_deaths": rng.integers(0, 10, n_locations * days).cumsum().astype("float64"),
+        "gdp_per_capita": rng.choice([np.nan, 1000.0, 2000.0], n_locations * days),
+        "human_development_index": rng.choice([np.nan, 0.5, 0.7], n_locations * days),
+    })
+    df.loc[rng.random(len(df)) < 0.1, "total_deaths"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_stream_clean_matches_build_store(tmp_path, shuffle):
+    df = owid_frame()
+    if shuffle:
+        df = df.sample(frac=1, random_state=0)
+    csv_path = str(tmp_path / "owid.csv")
+    df.to_csv(csv_path, index=False)
+
+    stream_clean(csv_path, chunk_size=37)
+    store_path = store_path_for(csv_path)
+    assert is_current(csv_path, store_path) and is_current(csv_path, raw_path_for(store_path))
+
+    full_path = str(tmp_path / "full.clean.feather")
+    build_store(csv_path, full_path)
+    pd.testing.assert_frame_equal(read_store(store_path), read_store(full_path))
+    pd.testing.assert_frame_equal(read_store(raw_path_for(store_path)),
+                                  read_store(raw_path_for(full_path)))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "full.clean.feather", "full.raw.feather", "owid.clean.feather", "owid.csv",
+        "owid.raw.feather"]